@@ -3,15 +3,28 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.api import api_router
+from app.api.v1.auth.keys import key_manager
+from app.api.v1.auth.revocation import revocation_filter
+from app.api.v1.classifiers.registry import classifier_registry
 from app.config import settings
 from app.db import db_helper
+from app.security.passwords import password_hasher_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> None:
     """Жизненный цикл приложения."""
+    await key_manager.start()
+    await db_helper.start()
+    await revocation_filter.start()
+    await classifier_registry.start()
+
     yield
 
+    await classifier_registry.stop()
+    await revocation_filter.stop()
+    await key_manager.stop()
+    password_hasher_pool.shutdown()
     await db_helper.dispose()
 
 
@@ -0,0 +1,92 @@
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Generic, Hashable, TypeVar
+
+from app.api.v1.auth.keys import key_manager
+from app.config import settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Ограниченный по размеру LRU кеш с временем жизни записей."""
+
+    def __init__(self, maxsize: int, ttl: timedelta) -> None:
+        """Инициализирует пустой кеш."""
+        self.maxsize = maxsize
+        self.ttl = ttl.total_seconds()
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def size(self) -> int:
+        """Количество записей в кеше."""
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Возвращает значение по ключу или None если записи нет или она устарела."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, expires_at: float | None = None) -> None:
+        """Сохраняет значение, запись живет не дольше ttl и не дольше expires_at."""
+        if self.maxsize <= 0:
+            return
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self._entries[key] = (deadline, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> None:
+        """Удаляет запись из кеша."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Очищает кеш."""
+        self._entries.clear()
+
+
+class VerifiedTokenCache(TTLCache[bytes, dict[str, str | datetime]]):
+    """LRU кеш токенов с уже проверенной подписью.
+
+    Ключом служит sha256 от токена, запись никогда не живет дольше exp токена.
+    """
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        """Ключ кеша для токена."""
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict[str, str | datetime] | None:
+        """Возвращает payload проверенного токена или None если токена нет в кеше."""
+        return super().get(self._digest(token))
+
+    def set(self, token: str, payload: dict[str, str | datetime]) -> None:
+        """Сохраняет payload проверенного токена."""
+        expires_at = float(payload["exp"]) if "exp" in payload else None
+        super().set(self._digest(token), payload, expires_at=expires_at)
+
+
+verified_token_cache = VerifiedTokenCache(maxsize=settings.jwt.token_cache_size, ttl=settings.jwt.token_cache_ttl)
+
+# После смены ключей ранее проверенные токены должны пройти проверку заново
+key_manager.on_reload(verified_token_cache.clear)
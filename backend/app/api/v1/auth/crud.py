@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import RevokedToken
+
+
+async def revoke_token_repo(session: AsyncSession, jti: UUID, user_id: UUID, expires_at: datetime) -> bool:
+    """Отзывает токен, возвращает False если токен уже был отозван ранее."""
+    stmt = (
+        insert(RevokedToken)
+        .values(jti=jti, user_id=user_id, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        .returning(RevokedToken.jti)
+    )
+    results = await session.execute(stmt)
+    await session.commit()
+    return results.scalar() is not None
+
+
+async def get_revoked_tokens_repo(session: AsyncSession, since: datetime | None = None) -> Sequence[Row]:
+    """Получает действующие отозванные токены, отозванные после since."""
+    stmt = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+        RevokedToken.expires_at > func.now()
+    )
+    if since is not None:
+        stmt = stmt.where(RevokedToken.revoked_at > since)
+    results = await session.execute(stmt)
+    return results.all()
+
+
+async def delete_expired_revoked_tokens_repo(session: AsyncSession) -> int:
+    """Удаляет истекшие отозванные токены, они уже не пройдут проверку срока действия."""
+    results = await session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= func.now()))
+    await session.commit()
+    return results.rowcount
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import jwt
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePrivateKey
@@ -8,6 +8,7 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
 from fastapi import HTTPException, status
 
+from app.api.v1.auth.keys import key_manager
 from app.config import settings
 
 
@@ -15,17 +16,20 @@ def _create_token(
     payload: dict[str, str | datetime],
     secret: RSAPrivateKey | EllipticCurvePrivateKey | Ed25519PrivateKey | Ed448PrivateKey | str | bytes,
     algorithm: str,
+    headers: dict[str, str] | None = None,
 ) -> str:
     """Создание токена."""
     return jwt.encode(
         payload=payload,
         key=secret,
         algorithm=algorithm,
+        headers=headers,
     )
 
 
 def create_access_token(user_id: UUID) -> str:
     """Создает access token."""
+    signing_key = key_manager.signing_key
     return _create_token(
         payload={
             "sub": str(user_id),
@@ -33,32 +37,39 @@ def create_access_token(user_id: UUID) -> str:
             "iat": datetime.now(timezone.utc),
             "exp": datetime.now(timezone.utc) + settings.jwt.access_token_expires_delta,
         },
-        secret=settings.jwt.private_key_path.read_bytes(),
-        algorithm=settings.jwt.algorithm,
+        secret=signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid},
     )
 
 
 def create_refresh_token(user_id: UUID) -> str:
     """Создает refresh token."""
+    signing_key = key_manager.signing_key
     return _create_token(
         payload={
             "sub": str(user_id),
             "token_type": "refresh",
+            "jti": str(uuid4()),
             "iat": datetime.now(timezone.utc),
             "exp": datetime.now(timezone.utc) + settings.jwt.refresh_token_expires_delta,
         },
-        secret=settings.jwt.private_key_path.read_bytes(),
-        algorithm=settings.jwt.algorithm,
+        secret=signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid},
     )
 
 
 def decode_token(token: str) -> dict[str, str | datetime]:
     """Декодирует токен и возвращает его payload."""
     try:
+        verification_key = key_manager.get_verification_key(jwt.get_unverified_header(token).get("kid"))
+        if verification_key is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
         payload = jwt.decode(
             token,
-            key=settings.jwt.public_key_path.read_bytes(),
-            algorithms=[settings.jwt.algorithm],
+            key=verification_key.public_key,
+            algorithms=[verification_key.algorithm],
         )
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
@@ -0,0 +1,202 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, rsa
+from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes, PublicKeyTypes
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+    load_pem_private_key,
+    load_pem_public_key,
+)
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Алгоритмы JWT для ключей на эллиптических кривых
+EC_CURVE_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+    "secp256k1": "ES256K",
+}
+
+
+def algorithm_for_key(public_key: PublicKeyTypes, rsa_algorithm: str) -> str:
+    """Определяет алгоритм JWT по типу ключа, для RSA ключей используется rsa_algorithm."""
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return rsa_algorithm
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        if public_key.curve.name not in EC_CURVE_ALGORITHMS:
+            raise ValueError(f"Кривая {public_key.curve.name} не поддерживается для JWT")
+        return EC_CURVE_ALGORITHMS[public_key.curve.name]
+    if isinstance(public_key, (ed25519.Ed25519PublicKey, ed448.Ed448PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Тип ключа {type(public_key).__name__} не поддерживается для JWT")
+
+
+def generate_private_key(algorithm: str) -> PrivateKeyTypes:
+    """Генерирует приватный ключ для алгоритма JWT."""
+    if algorithm.startswith(("RS", "PS")):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "ES384":
+        return ec.generate_private_key(ec.SECP384R1())
+    if algorithm == "ES512":
+        return ec.generate_private_key(ec.SECP521R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Алгоритм {algorithm} не поддерживается")
+
+
+def serialize_key_pair(private_key: PrivateKeyTypes) -> tuple[bytes, bytes]:
+    """Сериализует приватный и публичный ключи в PEM."""
+    private_pem = private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    public_pem = private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    return private_pem, public_pem
+
+
+@dataclass(frozen=True, slots=True)
+class JWTKey:
+    """Разобранный ключ для подписи и проверки токенов."""
+
+    kid: str
+    algorithm: str
+    public_key: PublicKeyTypes
+    private_key: PrivateKeyTypes | None = None
+
+
+class KeyManager:
+    """Менеджер ключей JWT.
+
+    Загружает и разбирает PEM файлы один раз, хранит несколько активных ключей по их kid
+    и перечитывает файлы при их изменении без перезапуска приложения.
+    Алгоритм каждого ключа определяется по его типу, поэтому во время миграции
+    можно одновременно принимать токены, подписанные RSA, EC и Ed25519 ключами.
+    """
+
+    def __init__(
+        self,
+        signing_kid: str,
+        private_key_path: Path,
+        public_key_path: Path,
+        verification_keys: dict[str, Path] | None = None,
+        reload_interval: float = 0,
+        rsa_algorithm: str = "RS256",
+    ) -> None:
+        """Инициализирует менеджер, сами ключи загружаются методом load."""
+        self.signing_kid = signing_kid
+        self.rsa_algorithm = rsa_algorithm
+        self.private_key_path = private_key_path
+        self.public_key_path = public_key_path
+        self.verification_keys = verification_keys or {}
+        self.reload_interval = reload_interval
+        self._keys: dict[str, JWTKey] = {}
+        self._mtimes: dict[Path, int | None] = {}
+        self._reload_callbacks: list[Callable[[], None]] = []
+        self._watcher: asyncio.Task | None = None
+
+    def _key_files(self) -> list[Path]:
+        """Список всех отслеживаемых файлов ключей."""
+        return [self.private_key_path, self.public_key_path, *self.verification_keys.values()]
+
+    def _read_mtimes(self) -> dict[Path, int | None]:
+        """Время последнего изменения файлов ключей."""
+        mtimes = {}
+        for path in self._key_files():
+            try:
+                mtimes[path] = path.stat().st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def _load_public_key(self, kid: str, path: Path) -> JWTKey:
+        """Загружает публичный ключ для проверки токенов."""
+        public_key = load_pem_public_key(path.read_bytes())
+        return JWTKey(kid=kid, algorithm=algorithm_for_key(public_key, self.rsa_algorithm), public_key=public_key)
+
+    def load(self) -> None:
+        """Загружает все ключи и атомарно заменяет текущий набор."""
+        mtimes = self._read_mtimes()
+        signing_key = self._load_public_key(self.signing_kid, self.public_key_path)
+        private_key = load_pem_private_key(self.private_key_path.read_bytes(), password=None)
+        if private_key.public_key() != signing_key.public_key:
+            raise ValueError("Приватный и публичный ключи JWT не образуют пару")
+        keys = {self.signing_kid: replace(signing_key, private_key=private_key)}
+        for kid, path in self.verification_keys.items():
+            if kid not in keys:
+                keys[kid] = self._load_public_key(kid, path)
+        self._keys = keys
+        self._mtimes = mtimes
+        for callback in self._reload_callbacks:
+            callback()
+
+    def on_reload(self, callback: Callable[[], None]) -> None:
+        """Регистрирует функцию, вызываемую после каждой загрузки ключей."""
+        self._reload_callbacks.append(callback)
+
+    @property
+    def signing_key(self) -> JWTKey:
+        """Ключ, которым подписываются новые токены."""
+        if not self._keys:
+            self.load()
+        return self._keys[self.signing_kid]
+
+    def get_verification_key(self, kid: str | None) -> JWTKey | None:
+        """Возвращает ключ для проверки токена по kid, токены без kid проверяются текущим ключом."""
+        if not self._keys:
+            self.load()
+        return self._keys.get(kid or self.signing_kid)
+
+    def reload_if_changed(self) -> bool:
+        """Перечитывает ключи если какой-либо из файлов изменился."""
+        mtimes = self._read_mtimes()
+        if mtimes == self._mtimes:
+            return False
+        try:
+            self.load()
+        except (OSError, ValueError, TypeError):
+            # Оставляем рабочий набор ключей, повторно попробуем после следующего изменения файлов
+            self._mtimes = mtimes
+            logger.exception("Не удалось перезагрузить ключи JWT")
+            return False
+        logger.info("Ключи JWT перезагружены")
+        return True
+
+    async def _watch(self) -> None:
+        """Периодически проверяет файлы ключей на изменения."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            self.reload_if_changed()
+
+    async def start(self) -> None:
+        """Загружает ключи и запускает отслеживание изменений файлов."""
+        self.load()
+        if self.reload_interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Останавливает отслеживание изменений файлов."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+
+
+key_manager = KeyManager(
+    signing_kid=settings.jwt.key_id,
+    private_key_path=settings.jwt.private_key_path,
+    public_key_path=settings.jwt.public_key_path,
+    verification_keys=settings.jwt.verification_keys,
+    reload_interval=settings.jwt.keys_reload_interval,
+    rsa_algorithm=settings.jwt.algorithm,
+)
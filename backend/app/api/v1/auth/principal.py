@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.api.v1.auth.cache import TTLCache
+from app.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Аутентифицированный пользователь без загрузки строки User из базы."""
+
+    id: UUID
+
+
+# Пользователи, существование которых уже проверено. Запись удаляется при удалении пользователя.
+principal_cache: TTLCache[UUID, Principal] = TTLCache(
+    maxsize=settings.principal.cache_size,
+    ttl=settings.principal.cache_ttl,
+)
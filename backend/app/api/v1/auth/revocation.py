@@ -0,0 +1,115 @@
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.auth import crud
+from app.config import settings
+from app.db import db_helper
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationFilter:
+    """Отозванные refresh токены в памяти процесса.
+
+    Каждый воркер загружает отозванные токены при старте и затем периодически догружает
+    только отозванные после последней синхронизации. Множество точное, поэтому проверка
+    не отозванного токена не требует запроса в базу. Токены, отозванные другим воркером
+    после последней синхронизации, отсекаются при ротации уникальностью jti в базе.
+    """
+
+    def __init__(self, sync_interval: float, sync_overlap: timedelta) -> None:
+        """Инициализирует пустой фильтр."""
+        self.sync_interval = sync_interval
+        self.sync_overlap = sync_overlap
+        self._revoked: dict[UUID, float] = {}
+        self._watermark: datetime | None = None
+        self._watcher: asyncio.Task | None = None
+        self.hits = 0
+        self.synced_at: datetime | None = None
+
+    @property
+    def size(self) -> int:
+        """Количество отозванных токенов в фильтре."""
+        return len(self._revoked)
+
+    def is_revoked(self, jti: UUID) -> bool:
+        """Проверяет отозван ли токен."""
+        if jti in self._revoked:
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, jti: UUID, expires_at: datetime) -> None:
+        """Добавляет отозванный токен."""
+        self._revoked[jti] = expires_at.timestamp()
+
+    def _prune(self) -> None:
+        """Удаляет истекшие токены, они будут отклонены проверкой срока действия."""
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+
+    async def sync(self) -> None:
+        """Догружает отозванные после последней синхронизации токены, в базу ничего не пишет.
+
+        Истекшие токены из таблицы удаляет отдельная команда delete_expired_revoked_tokens.py.
+        """
+        # Отступ назад покрывает транзакции, которые зафиксировались позже своего now()
+        since = self._watermark - self.sync_overlap if self._watermark is not None else None
+        async with db_helper.session_factory() as session:
+            rows = await crud.get_revoked_tokens_repo(session, since)
+        for row in rows:
+            self.add(row.jti, row.expires_at)
+            if self._watermark is None or row.revoked_at > self._watermark:
+                self._watermark = row.revoked_at
+        self._prune()
+        self.synced_at = datetime.now().astimezone()
+
+    async def _sync_safely(self) -> None:
+        """Синхронизация с логированием ошибок, при ошибке повторим на следующей итерации."""
+        try:
+            await self.sync()
+        except (SQLAlchemyError, OSError):
+            logger.exception("Не удалось синхронизировать отозванные токены")
+
+    async def _watch(self) -> None:
+        """Периодически синхронизирует фильтр с базой."""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self._sync_safely()
+
+    async def start(self) -> None:
+        """Загружает отозванные токены и запускает периодическую синхронизацию."""
+        await self._sync_safely()
+        if self.sync_interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Останавливает периодическую синхронизацию."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+
+
+revocation_filter = RevocationFilter(
+    sync_interval=settings.jwt.revocation_sync_interval,
+    sync_overlap=settings.jwt.revocation_sync_overlap,
+)
+
+
+async def revoke_refresh_token(session: AsyncSession, payload: dict[str, datetime | str]) -> bool:
+    """Отзывает refresh токен, возвращает False если он уже был отозван, в том числе другим воркером."""
+    jti = UUID(payload["jti"])
+    expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+    revoked = await crud.revoke_token_repo(session, jti, UUID(payload["sub"]), expires_at)
+    revocation_filter.add(jti, expires_at)
+    return revoked
@@ -0,0 +1,97 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+from collections.abc import Sequence
+
+from pydantic import TypeAdapter
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.classifiers import crud
+from app.api.v1.classifiers.schemas import ReadTaskStatus
+from app.config import settings
+from app.db import db_helper
+
+logger = logging.getLogger(__name__)
+
+task_status_list_adapter = TypeAdapter(list[ReadTaskStatus])
+
+
+class ClassifierRegistry:
+    """Классификаторы в памяти процесса.
+
+    Справочные данные загружаются при старте приложения и периодически перечитываются,
+    поэтому ответы со статусами задач не требуют запросов и join к таблицам классификаторов.
+    После изменения классификаторов в базе нужно вызвать invalidate, в остальных воркерах
+    изменения подхватятся не позже чем через reload_interval.
+    """
+
+    def __init__(self, reload_interval: float) -> None:
+        """Инициализирует пустой реестр."""
+        self.reload_interval = reload_interval
+        self._task_statuses: dict[int, ReadTaskStatus] = {}
+        self.task_statuses_json = b"[]"
+        self.etag = ""
+        self._watcher: asyncio.Task | None = None
+
+    @property
+    def task_statuses(self) -> Sequence[ReadTaskStatus]:
+        """Все статусы задач."""
+        return list(self._task_statuses.values())
+
+    def get_task_status(self, task_status_id: int) -> ReadTaskStatus:
+        """Статус задачи по id."""
+        try:
+            return self._task_statuses[task_status_id]
+        except KeyError:
+            raise LookupError(f"Статус задачи {task_status_id} не загружен в реестр классификаторов") from None
+
+    def has_task_status(self, task_status_id: int) -> bool:
+        """Проверяет есть ли статус задачи с таким id."""
+        return task_status_id in self._task_statuses
+
+    async def load(self, session: AsyncSession) -> None:
+        """Загружает классификаторы и атомарно заменяет текущие."""
+        task_statuses = task_status_list_adapter.validate_python(
+            await crud.get_list_task_status_repo(session), from_attributes=True
+        )
+        self.replace(task_statuses)
+
+    def replace(self, task_statuses: list[ReadTaskStatus]) -> None:
+        """Заменяет статусы задач и пересчитывает сериализованный ответ и его ETag."""
+        task_statuses_json = task_status_list_adapter.dump_json(task_statuses)
+        self._task_statuses = {task_status.id: task_status for task_status in task_statuses}
+        self.task_statuses_json = task_statuses_json
+        self.etag = f'"{hashlib.sha256(task_statuses_json).hexdigest()[:32]}"'
+
+    async def invalidate(self) -> None:
+        """Перечитывает классификаторы из базы после их изменения."""
+        async with db_helper.session_factory() as session:
+            await self.load(session)
+
+    async def _watch(self) -> None:
+        """Периодически перечитывает классификаторы."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.invalidate()
+            except (SQLAlchemyError, OSError):
+                logger.exception("Не удалось перечитать классификаторы")
+
+    async def start(self) -> None:
+        """Загружает классификаторы и запускает их периодическое перечитывание."""
+        await self.invalidate()
+        if self.reload_interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Останавливает периодическое перечитывание."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._watcher
+            self._watcher = None
+
+
+classifier_registry = ClassifierRegistry(reload_interval=settings.classifiers.reload_interval)
@@ -1,20 +1,24 @@
-from typing import Annotated, Sequence
+from typing import Sequence
 
-from fastapi import APIRouter
-from fastapi.params import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Response, status
 
-from app.api.v1.classifiers import crud
+from app.api.v1.classifiers.registry import classifier_registry
 from app.api.v1.classifiers.schemas import ReadTaskStatus
-from app.db import db_helper
-from app.db.models import TaskStatus
+from app.api.v1.dependencies.conditional import IfNoneMatch, is_not_modified
 
 router = APIRouter(tags=["classifiers"])
 
 
-@router.get("/task_status/", response_model=Sequence[ReadTaskStatus])
+@router.get(
+    "/task_status/",
+    response_model=Sequence[ReadTaskStatus],
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Классификатор не изменился"}},
+)
 async def get_list_task_status(
-    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-) -> Sequence[TaskStatus]:
+    if_none_match: IfNoneMatch = None,
+) -> Response:
     """Получение содержимого классификатора статусов задач."""
-    return await crud.get_list_task_status_repo(session)
+    headers = {"ETag": classifier_registry.etag, "Cache-Control": "no-cache"}
+    if is_not_modified(classifier_registry.etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=classifier_registry.task_statuses_json, media_type="application/json", headers=headers)
@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated
+
+from fastapi import Header, HTTPException, status
+
+from app.api.v1.classifiers.registry import classifier_registry
+from app.db.models import Task, User
+
+
+def make_etag(*parts: object) -> str:
+    """Строит ETag из значений, однозначно определяющих представление ресурса."""
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def task_version(task: Task) -> datetime:
+    """Время последнего изменения задачи."""
+    return task.updated_at or task.created_at
+
+
+def task_etag(task: Task) -> str:
+    """ETag задачи, зависит и от классификатора статусов, так как его название входит в ответ.
+
+    Набор полей ответа в ETag не входит: ответы с разными fields различаются адресом, а ETag любого из них
+    подходит для If-Match при изменении задачи.
+    """
+    return make_etag(task.id, task_version(task).isoformat(), classifier_registry.etag)
+
+
+def user_etag(user: User) -> str:
+    """ETag пользователя."""
+    return make_etag(user.id, user.updated_at.isoformat())
+
+
+def validator_headers(etag: str, version: datetime) -> dict[str, str]:
+    """Заголовки ETag и Last-Modified ответа."""
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(version.astimezone(timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+
+def _split_etags(header: str) -> list[str]:
+    """Разбирает список ETag из заголовка."""
+    return [etag.strip() for etag in header.split(",")]
+
+
+def is_not_modified(
+    etag: str,
+    if_none_match: str | None,
+    version: datetime | None = None,
+    if_modified_since: str | None = None,
+) -> bool:
+    """Проверяет условный GET, If-None-Match имеет приоритет над If-Modified-Since.
+
+    If-Modified-Since проверяется только для ресурсов с известным временем изменения version.
+    """
+    if if_none_match is not None:
+        etags = _split_etags(if_none_match)
+        return "*" in etags or any(candidate.removeprefix("W/") == etag for candidate in etags)
+    if if_modified_since is not None and version is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return version.replace(microsecond=0) <= since
+    return False
+
+
+def check_if_match(etag: str, if_match: str | None) -> None:
+    """Отклоняет изменение ресурса, если клиент прислал ETag устаревшей версии."""
+    if if_match is None:
+        return
+    etags = _split_etags(if_match)
+    if "*" not in etags and etag not in etags:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Ресурс был изменен, получите актуальную версию",
+        )
+
+
+IfNoneMatch = Annotated[str | None, Header(description="ETag полученной ранее версии")]
+IfModifiedSince = Annotated[str | None, Header(description="Last-Modified полученной ранее версии")]
+IfMatch = Annotated[str | None, Header(description="ETag версии, которую изменяет клиент")]
@@ -6,8 +6,11 @@ from fastapi.params import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from typing_extensions import Annotated
 
+from app.api.v1.auth.cache import verified_token_cache
 from app.api.v1.auth.jwt import decode_token
+from app.api.v1.auth.revocation import revocation_filter
 from app.api.v1.users.schemas import RefreshToken
+from app.db.db_helper import current_user_id
 
 http_bearer = HTTPBearer()
 
@@ -17,18 +20,34 @@ def get_payload_from_refresh_token_from_json(token: RefreshToken) -> dict[str, d
     return decode_token(token.refresh_token)
 
 
-def user_id_from_refresh_token(payload: Annotated[dict, Depends(get_payload_from_refresh_token_from_json)]) -> UUID:
-    """Получает user_id из refresh токена."""
+def refresh_token_payload(
+    payload: Annotated[dict, Depends(get_payload_from_refresh_token_from_json)],
+) -> dict[str, datetime | str]:
+    """Проверяет что refresh токен не отозван и возвращает его payload."""
     if payload.get("token_type") != "refresh":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Тип токена должен быть 'refresh'")
+    if "jti" not in payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Устаревший токен, выполните вход заново")
+    if revocation_filter.is_revoked(UUID(payload["jti"])):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен отозван")
+    return payload
+
+
+def user_id_from_refresh_token(payload: Annotated[dict, Depends(refresh_token_payload)]) -> UUID:
+    """Получает user_id из refresh токена."""
     return UUID(payload["sub"])
 
 
 async def get_current_user_id(credentials: Annotated[HTTPAuthorizationCredentials, Depends(http_bearer)]) -> UUID:
     """Получает User_id из токена."""
-    payload = decode_token(credentials.credentials)
+    payload = verified_token_cache.get(credentials.credentials)
+    if payload is None:
+        payload = decode_token(credentials.credentials)
+        verified_token_cache.set(credentials.credentials, payload)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Некорректный токен")
     if payload["token_type"] != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Тип токена должен быть 'access'")
-    return UUID(payload["sub"])
+    user_id = UUID(payload["sub"])
+    current_user_id.set(user_id)
+    return user_id
@@ -1,24 +1,102 @@
+from dataclasses import dataclass
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Query, status
 from fastapi.params import Depends
+from sqlalchemy import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import load_only
 
-from app.api.v1.dependencies.users import get_current_user
+from app.api.v1.auth.principal import Principal
+from app.api.v1.dependencies.conditional import IfMatch, check_if_match, task_etag
+from app.api.v1.dependencies.users import get_current_principal, get_current_principal_for_write
 from app.api.v1.tasks import crud
+from app.api.v1.tasks.fields import TASK_DETAIL_FIELDS, parse_fields, task_columns
 from app.db import db_helper
-from app.db.models import Task, User
+from app.db.models import Task
 
 
 async def get_task_by_id_for_current_user(
     task_id: UUID,
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_principal)],
 ) -> Task:
     """Получение задачи по id для текущего пользователя."""
-    task = await crud.get_task_by_id_repo(session, task_id, joinedload(Task.task_status))
+    task = await crud.get_task_by_id_repo(session, task_id)
     if task is None or task.user_id != user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
     return task
+
+
+async def task_detail_fields(
+    fields: Annotated[str | None, Query(title="Поля ответа через запятую", examples=["id,title,task_status"])] = None,
+) -> frozenset[str] | None:
+    """Поля ответа при чтении задачи, None - все поля."""
+    try:
+        return parse_fields(fields, TASK_DETAIL_FIELDS)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error))
+
+
+async def get_task_by_id_for_current_user_for_read(
+    task_id: UUID,
+    session: Annotated[AsyncSession, Depends(db_helper.get_read_session)],
+    user: Annotated[Principal, Depends(get_current_principal)],
+    fields: Annotated[frozenset[str] | None, Depends(task_detail_fields)],
+) -> Task:
+    """Получение задачи по id для текущего пользователя только для чтения, по возможности с реплики.
+
+    Если запрошены не все поля, загружаются только нужные для них колонки.
+    """
+    if fields is None:
+        return await get_task_by_id_for_current_user(task_id, session, user)
+    columns = task_columns(fields, Task.id, Task.user_id, Task.created_at, Task.updated_at)
+    task = await crud.get_task_by_id_repo(session, task_id, load_only(*columns))
+    if task is None or task.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
+    return task
+
+
+@dataclass(frozen=True, slots=True)
+class TaskWriteScope:
+    """Условия, по которым задача текущего пользователя изменяется или удаляется одним запросом."""
+
+    conditions: tuple[ColumnElement[bool], ...]
+    conditional: bool = False
+
+    def not_found(self) -> HTTPException:
+        """Ошибка для запроса, не затронувшего ни одной задачи.
+
+        Для условного запроса задача была изменена или удалена после проверки If-Match.
+        """
+        if self.conditional:
+            return HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Ресурс был изменен, получите актуальную версию",
+            )
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
+
+
+async def get_task_write_scope(
+    task_id: UUID,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    user: Annotated[Principal, Depends(get_current_principal_for_write)],
+    if_match: IfMatch = None,
+) -> TaskWriteScope:
+    """Условия изменения задачи текущего пользователя по id.
+
+    Без If-Match задача не загружается, принадлежность пользователю проверяет сам запрос изменения.
+    С If-Match загружается только версия задачи для проверки ETag, а запрос изменения затрагивает задачу
+    только если она не менялась после проверки.
+    """
+    conditions = (Task.id == task_id, Task.user_id == user.id)
+    if if_match is None:
+        return TaskWriteScope(conditions)
+    task = await crud.get_task_by_id_repo(
+        session, task_id, load_only(Task.id, Task.user_id, Task.created_at, Task.updated_at)
+    )
+    if task is None or task.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена")
+    check_if_match(task_etag(task), if_match)
+    return TaskWriteScope((*conditions, Task.updated_at.is_not_distinct_from(task.updated_at)), conditional=True)
@@ -1,12 +1,17 @@
+from dataclasses import dataclass
 from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.auth.principal import Principal, principal_cache
+from app.api.v1.dependencies.conditional import IfMatch, check_if_match, user_etag
 from app.api.v1.dependencies.jwt import get_current_user_id
 from app.api.v1.users import crud
 from app.api.v1.users.schemas import UserLogin
+from app.config import settings
 from app.db import db_helper
 from app.db.models import User
 
@@ -18,8 +23,14 @@ async def auth_user(
     user = await crud.get_user_by_email_repo(session, user_credentials.email)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Некорректный email или пароль")
-    if not user.verify_password(user_credentials.password):
+    if not await user.check_password(user_credentials.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Некорректный email или пароль")
+    if user.password_needs_rehash():
+        await user.set_password(user_credentials.password)
+        await session.commit()
+    # Пользователь прочитан с основного сервера, сразу после входа его чтения тоже идут туда,
+    # пока реплики могут еще не знать о недавно зарегистрированном пользователе
+    db_helper.remember_write(user.id)
     return user
 
 
@@ -32,3 +43,82 @@ async def get_current_user(
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
     return user
+
+
+async def get_current_user_for_read(
+    user_id: Annotated[UUID, Depends(get_current_user_id)],
+    session: Annotated[AsyncSession, Depends(db_helper.get_read_session)],
+) -> User:
+    """Получает текущего пользователя только для чтения, по возможности с реплики."""
+    return await get_current_user(user_id, session)
+
+
+@dataclass(frozen=True, slots=True)
+class UserWriteScope:
+    """Условия, по которым текущий пользователь изменяется одним запросом."""
+
+    conditions: tuple[ColumnElement[bool], ...]
+    conditional: bool = False
+
+    def not_found(self) -> HTTPException:
+        """Ошибка для запроса, не затронувшего пользователя.
+
+        Для условного запроса пользователь был изменен после проверки If-Match.
+        """
+        if self.conditional:
+            return HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Ресурс был изменен, получите актуальную версию",
+            )
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
+
+
+async def get_current_user_for_update(
+    user: Annotated[User, Depends(get_current_user)],
+    if_match: IfMatch = None,
+) -> UserWriteScope:
+    """Условия изменения текущего пользователя с проверкой If-Match.
+
+    С If-Match запрос изменения затрагивает пользователя, только если он не менялся после проверки.
+    """
+    conditions = (User.id == user.id,)
+    if if_match is None:
+        return UserWriteScope(conditions)
+    check_if_match(user_etag(user), if_match)
+    return UserWriteScope((*conditions, User.updated_at == user.updated_at), conditional=True)
+
+
+async def _get_principal(user_id: UUID, session: AsyncSession) -> Principal:
+    """Получает текущего пользователя без загрузки всей строки User.
+
+    Если режим principal выключен, пользователь загружается из базы на каждый запрос.
+    """
+    if not settings.principal.enabled:
+        return Principal(id=(await get_current_user(user_id, session)).id)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        if not await crud.user_exists_repo(session, user_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
+        principal = Principal(id=user_id)
+        principal_cache.set(user_id, principal)
+    return principal
+
+
+async def get_current_principal(
+    user_id: Annotated[UUID, Depends(get_current_user_id)],
+    session: Annotated[AsyncSession, Depends(db_helper.get_read_session)],
+) -> Principal:
+    """Получает текущего пользователя для чтения, по возможности с реплики."""
+    return await _get_principal(user_id, session)
+
+
+async def get_current_principal_for_write(
+    user_id: Annotated[UUID, Depends(get_current_user_id)],
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+) -> Principal:
+    """Получает текущего пользователя для изменений, проверяя его на основном сервере.
+
+    Изменения выполняются на основном сервере, поэтому и пользователь проверяется там же:
+    отстающая реплика может еще не знать о только что зарегистрированном пользователе.
+    """
+    return await _get_principal(user_id, session)
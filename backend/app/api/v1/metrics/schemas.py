@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class CacheStats(BaseModel):
+    """Статистика кеша."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class PasswordHasherStats(BaseModel):
+    """Статистика пула хеширования паролей."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    max_workers: int
+    max_queue: int
+    in_flight: int
+    queued: int
+    completed: int
+    rejected: int
+    total_wait_time: float
+    total_run_time: float
+
+
+class RevocationFilterStats(BaseModel):
+    """Статистика фильтра отозванных токенов."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    size: int
+    hits: int
+    synced_at: datetime | None
+
+
+class DataBasePoolStats(BaseModel):
+    """Статистика пула соединений с базой данных."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    total_wait_time: float
+    max_wait_time: float
+
+
+class ReplicaStats(BaseModel):
+    """Состояние реплики базы данных."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    healthy: bool
+    lag: float
+
+
+class Metrics(BaseModel):
+    """Метрики приложения."""
+
+    token_cache: CacheStats
+    principal_cache: CacheStats
+    password_hasher: PasswordHasherStats
+    revocation_filter: RevocationFilterStats
+    db_pool: DataBasePoolStats
+    db_replicas: list[ReplicaStats]
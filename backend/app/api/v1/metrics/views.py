@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+
+from app.api.v1.auth.cache import verified_token_cache
+from app.api.v1.auth.principal import principal_cache
+from app.api.v1.auth.revocation import revocation_filter
+from app.api.v1.metrics.schemas import (
+    CacheStats,
+    DataBasePoolStats,
+    Metrics,
+    PasswordHasherStats,
+    ReplicaStats,
+    RevocationFilterStats,
+)
+from app.db import db_helper
+from app.security.passwords import password_hasher_pool
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/", response_model=Metrics)
+async def get_metrics() -> Metrics:
+    """Получение метрик приложения."""
+    return Metrics(
+        token_cache=CacheStats.model_validate(verified_token_cache),
+        principal_cache=CacheStats.model_validate(principal_cache),
+        password_hasher=PasswordHasherStats.model_validate(password_hasher_pool),
+        revocation_filter=RevocationFilterStats.model_validate(revocation_filter),
+        db_pool=DataBasePoolStats.model_validate(db_helper.pool_stats()),
+        db_replicas=[ReplicaStats.model_validate(replica) for replica in db_helper.replicas],
+    )
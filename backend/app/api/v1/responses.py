@@ -0,0 +1,37 @@
+from typing import Any, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class RawJSONResponse(Response):
+    """Ответ с уже сериализованным в байты JSON."""
+
+    media_type = "application/json"
+
+
+def json_response(
+    adapter: TypeAdapter[T],
+    content: Any,
+    headers: dict[str, str] | None = None,
+) -> T | RawJSONResponse:
+    """Строит ответ из ORM объектов по заранее собранной схеме.
+
+    В режиме fast_json объекты один раз проходят через схему и сразу сериализуются в байты на стороне pydantic-core,
+    FastAPI получает готовый Response и не валидирует его по response_model повторно.
+    Без fast_json возвращается модель схемы, которую FastAPI обработает как обычно.
+    """
+    model = adapter.validate_python(content, from_attributes=True)
+    if not settings.api.fast_json:
+        return model
+    return RawJSONResponse(content=adapter.dump_json(model), headers=headers)
+
+
+def raw_json_response(content: Any, headers: dict[str, str] | None = None) -> RawJSONResponse:
+    """Сериализует данные без схемы, например ответ с частью полей, который не соответствует response_model."""
+    return RawJSONResponse(content=to_json(content), headers=headers)
@@ -1,16 +1,49 @@
-from datetime import datetime, timezone
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone
 from typing import Sequence
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    Row,
+    Select,
+    Update,
+    and_,
+    any_,
+    bindparam,
+    case,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    null,
+    select,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import load_only
 from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from app.api.v1.classifiers.schemas import TaskStatusID
-from app.api.v1.tasks.schemas import CreateTask, UpdateTask
-from app.constants import COMPLETED_TASK_STATUS_ID, NOT_COMPLETED_TASK_STATUS_ID
-from app.db.models import Task
+from app.api.v1.tasks.fields import TASK_LIST_FIELDS, task_columns
+from app.api.v1.tasks.filters import TaskListParams
+from app.api.v1.tasks.pagination import Cursor, keyset_conditions
+from app.api.v1.tasks.schemas import CreateTask, PartialUpdateTaskInBatch, UpdateTask
+from app.constants import (
+    COMPLETED_TASK_STATUS_ID,
+    HTML_ESCAPES,
+    NOT_COMPLETED_TASK_STATUS_ID,
+    TASK_SEARCH_CONFIG,
+    TASK_SEARCH_HEADLINE_OPTIONS,
+)
+from app.db.models import Task, TaskCompletionCounter, TaskCounter, TaskDeadlineCounter
+from app.db.queries import estimate_count
 
 
 async def get_task_by_id_repo(session: AsyncSession, task_id: UUID, *options: _AbstractLoad) -> Task:
@@ -23,82 +56,390 @@ async def get_task_by_id_repo(session: AsyncSession, task_id: UUID, *options: _A
 
 
 async def create_task_repo(session: AsyncSession, new_task: CreateTask, user_id: UUID) -> Task:
-    """Создание новой задачи в базе данных."""
-    task = Task(**new_task.model_dump(), user_id=user_id)
-    session.add(task)
+    """Создание новой задачи в базе данных, созданная строка возвращается тем же запросом через RETURNING."""
+    stmt = insert(Task).values(**new_task.model_dump(), user_id=user_id).returning(Task)
+    results = await session.execute(stmt)
+    task = results.scalar_one()
     await session.commit()
-    task = await get_task_by_id_repo(session, task.id, joinedload(Task.task_status))
     return task
 
 
+async def count_tasks_for_user_repo(session: AsyncSession, user_id: UUID, task_status_id: int | None = None) -> int:
+    """Количество задач пользователя по счетчикам, без просмотра самих задач."""
+    stmt = select(func.coalesce(func.sum(TaskCounter.count), 0)).where(TaskCounter.user_id == user_id)
+    if task_status_id:
+        stmt = stmt.where(TaskCounter.task_status_id == task_status_id)
+    results = await session.execute(stmt)
+    return results.scalar()
+
+
+def tasks_for_user_query(user_id: UUID, params: TaskListParams, after: ColumnElement[bool] | None = None) -> Select:
+    """Запрос страницы списка задач пользователя.
+
+    Задачи фильтруются по params и сортируются по sort_field и id. Если передано условие курсора after из
+    keyset_conditions, выбираются задачи после курсора, такой запрос читает из индекса только страницу
+    вне зависимости от ее номера.
+    Запрос выбирает на одну задачу больше limit, чтобы понять есть ли следующая страница.
+    Загружаются только колонки, нужные для полей ответа, id и поле сортировки для курсора.
+    """
+    sort_column = getattr(Task, params.sort_field)
+    columns = task_columns(params.selected_fields or TASK_LIST_FIELDS, Task.id, sort_column)
+    stmt = select(Task).where(Task.user_id == user_id, *params.conditions()).options(load_only(*columns))
+    if after is not None:
+        stmt = stmt.where(after)
+    if params.sort_direction == "asc":
+        stmt = stmt.order_by(sort_column.asc(), Task.id.asc())
+    else:
+        stmt = stmt.order_by(sort_column.desc(), Task.id.desc())
+    stmt = stmt.limit(params.limit + 1)
+    if params.offset:
+        stmt = stmt.offset(params.offset)
+    return stmt
+
+
+async def _get_tasks_after_cursor(
+    session: AsyncSession, user_id: UUID, params: TaskListParams, cursor: Cursor, *options: _AbstractLoad
+) -> list[Task]:
+    """Страница задач после курсора, сегменты списка читаются по очереди, пока страница не заполнится."""
+    tasks = []
+    for condition in keyset_conditions(cursor):
+        stmt = tasks_for_user_query(user_id, params, condition).limit(params.limit + 1 - len(tasks))
+        if options:
+            stmt = stmt.options(*options)
+        results = await session.execute(stmt)
+        tasks.extend(results.scalars().all())
+        if len(tasks) > params.limit:
+            break
+    return tasks
+
+
 async def get_tasks_for_user_repo(
     session: AsyncSession,
     user_id: UUID,
+    params: TaskListParams,
+    *options: _AbstractLoad,
+    cursor: Cursor | None = None,
+) -> tuple[Sequence[Task], int | None]:
+    """Получает страницу списка задач для пользователя и их количество.
+
+    Количество задач без фильтров, кроме статуса, берется из счетчиков. С другими фильтрами точное
+    количество считается оконной функцией в том же запросе, что и страница, а оценка берется из плана запроса.
+    """
+    filtered_stmt = select(Task.id).where(Task.user_id == user_id, *params.conditions())
+    count_stmt = select(func.count()).select_from(filtered_stmt.subquery())
+    stmt = tasks_for_user_query(user_id, params)
+
+    count = None
+    count_in_page = False
+    if params.count != "none" and params.countable_by_counters:
+        count = await count_tasks_for_user_repo(session, user_id, params.task_status_id)
+    elif params.count == "estimate":
+        count = await estimate_count(session, filtered_stmt)
+    elif params.count == "exact" and cursor is None:
+        count_in_page = True
+        stmt = stmt.add_columns(func.count().over().label("count"))
+    elif params.count == "exact":
+        # Условие курсора сужает выборку, поэтому оконная функция посчитала бы только оставшиеся задачи
+        count_results = await session.execute(count_stmt)
+        count = count_results.scalar()
+
+    if cursor is not None:
+        return await _get_tasks_after_cursor(session, user_id, params, cursor, *options), count
+
+    if options:
+        stmt = stmt.options(*options)
+    results = await session.execute(stmt)
+    if not count_in_page:
+        return results.scalars().all(), count
+
+    rows = results.all()
+    if rows:
+        return [row.Task for row in rows], rows[0].count
+    if params.offset:
+        # Страница за пределами списка, оконной функции не на чем вернуть количество
+        count_results = await session.execute(count_stmt)
+        return [], count_results.scalar()
+    return [], 0
+
+
+def _html_escape(expression: ColumnElement[str]) -> ColumnElement[str]:
+    """Экранирует спецсимволы HTML в тексте средствами SQL."""
+    for char, entity in HTML_ESCAPES:
+        expression = func.replace(expression, char, entity)
+    return expression
+
+
+def _headline(expression: ColumnElement[str], ts_query: ColumnElement) -> ColumnElement[str]:
+    """Фрагменты текста с подсвеченными совпадениями.
+
+    Подсветка строится по экранированному тексту, поэтому результат - безопасный HTML,
+    в котором разметкой являются только теги подсветки.
+    """
+    return func.ts_headline(TASK_SEARCH_CONFIG, _html_escape(expression), ts_query, TASK_SEARCH_HEADLINE_OPTIONS)
+
+
+async def search_tasks_for_user_repo(
+    session: AsyncSession,
+    user_id: UUID,
+    query: str,
     *options: _AbstractLoad,
-    title: str | None = None,
-    task_status_id: int | None = None,
-    sort_field: str | None = None,
-    sort_direction: str = "desc",
     limit: int = 10,
     offset: int = 0,
-) -> tuple[Sequence[Task], int]:
-    """Получает список задач для пользователя."""
-    stmt = select(Task).where(Task.user_id == user_id)
-    if title:
-        stmt = stmt.where(Task.title.icontains(title))
-    if task_status_id:
-        stmt = stmt.where(Task.task_status_id == task_status_id)
-    if sort_field and hasattr(Task, sort_field):
-        if sort_direction == "asc":
-            stmt = stmt.order_by(getattr(Task, sort_field).asc())
-        else:
-            stmt = stmt.order_by(getattr(Task, sort_field).desc())
+) -> Sequence[Row]:
+    """Полнотекстовый поиск задач пользователя по заголовку и описанию.
+
+    Возвращает строки с задачей, рангом и подсвеченными фрагментами заголовка и описания в виде HTML
+    с экранированным текстом задачи.
+    Подсветка считается только для задач страницы, поиск и ранжирование идут по индексу search_vector.
+    """
+    ts_query = func.websearch_to_tsquery(TASK_SEARCH_CONFIG, query)
+    rank = func.ts_rank_cd(Task.search_vector, ts_query)
+    page = (
+        select(Task.id, rank.label("rank"))
+        .where(Task.user_id == user_id, Task.search_vector.bool_op("@@")(ts_query))
+        .order_by(rank.desc(), Task.id)
+        .limit(limit)
+        .offset(offset)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Task,
+            page.c.rank,
+            _headline(Task.title, ts_query).label("title_highlight"),
+            _headline(Task.description, ts_query).label("description_highlight"),
+        )
+        .join(page, page.c.id == Task.id)
+        .order_by(page.c.rank.desc(), Task.id)
+        .options(load_only(*task_columns(TASK_LIST_FIELDS)))
+    )
     if options:
         stmt = stmt.options(*options)
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    count_results = await session.execute(count_stmt)
-    count = count_results.scalar()
-    if limit:
-        stmt = stmt.limit(limit)
-    if offset is not None:
-        stmt = stmt.offset(offset)
     results = await session.execute(stmt)
-    return results.scalars().all(), count
+    return results.all()
+
 
+def _completed_at_transition(task_status_id: int, completed_at: ColumnElement | datetime | None) -> ColumnElement:
+    """Значение completed_at при смене статуса, вычисляется по текущему статусу задачи в самом запросе UPDATE.
 
-async def delete_task_repo(session: AsyncSession, task: Task) -> None:
-    """Удаление задачи."""
-    await session.delete(task)
+    При переходе из "Не выполнено" в "Выполнено" задача отмечается выполненной сейчас,
+    при обратном переходе отметка снимается, в остальных случаях остается значение completed_at.
+    """
+    if task_status_id == COMPLETED_TASK_STATUS_ID:
+        return case((Task.task_status_id == NOT_COMPLETED_TASK_STATUS_ID, func.now()), else_=completed_at)
+    if task_status_id == NOT_COMPLETED_TASK_STATUS_ID:
+        return case((Task.task_status_id == COMPLETED_TASK_STATUS_ID, null()), else_=completed_at)
+    return completed_at
+
+
+async def delete_task_repo(session: AsyncSession, *conditions: ColumnElement[bool]) -> bool:
+    """Удаление задачи запросом DELETE ... RETURNING по условиям, обычно id задачи и ее владельцу.
+
+    Возвращает False, если ни одна задача не удалена.
+    """
+    stmt = delete(Task).where(*conditions).returning(Task.id)
+    results = await session.execute(stmt)
+    deleted = results.scalar() is not None
     await session.commit()
+    return deleted
 
 
-async def update_task_repo(session: AsyncSession, task: Task, update_task: UpdateTask, partial=False) -> Task:
-    """Обновление задачи."""
-    if (
-        task.task_status_id == NOT_COMPLETED_TASK_STATUS_ID
-        and update_task.task_status_id == COMPLETED_TASK_STATUS_ID
-        and update_task.completed_at is None
-    ):
-        update_task.completed_at = datetime.now(tz=timezone.utc)
-    task_data = update_task.model_dump(
-        exclude_unset=partial,
-    )
-    for key, value in task_data.items():
-        setattr(task, key, value)
+async def _update_task(session: AsyncSession, conditions: Sequence[ColumnElement[bool]], values: dict) -> Task | None:
+    """Изменяет задачу запросом UPDATE ... RETURNING, загруженный ранее объект задачи обновляется значениями из базы."""
+    stmt = update(Task).where(*conditions).values(**values).returning(Task).execution_options(populate_existing=True)
+    results = await session.execute(stmt)
+    task = results.scalar()
     await session.commit()
-    await session.refresh(task)
     return task
 
 
-async def update_task_status_repo(session: AsyncSession, task: Task, task_status: TaskStatusID) -> Task:
-    """Обновление статуса задачи."""
-    if task.task_status_id == NOT_COMPLETED_TASK_STATUS_ID and task_status.id == COMPLETED_TASK_STATUS_ID:
-        task.completed_at = datetime.now(tz=timezone.utc)
-    if task.task_status_id == COMPLETED_TASK_STATUS_ID and task_status.id == NOT_COMPLETED_TASK_STATUS_ID:
-        task.completed_at = None
+async def update_task_repo(
+    session: AsyncSession, update_task: UpdateTask, *conditions: ColumnElement[bool], partial=False
+) -> Task | None:
+    """Обновление задачи, возвращает None если под условия не попала ни одна задача.
+
+    Если задача переводится в статус "Выполнено" без completed_at, время выполнения проставляет сам запрос.
+    """
+    task_data = update_task.model_dump(exclude_unset=partial)
+    if update_task.task_status_id == COMPLETED_TASK_STATUS_ID and update_task.completed_at is None:
+        task_data["completed_at"] = _completed_at_transition(
+            COMPLETED_TASK_STATUS_ID, task_data.get("completed_at", Task.completed_at)
+        )
+    return await _update_task(session, conditions, task_data)
+
+
+async def update_task_status_repo(
+    session: AsyncSession, task_status: TaskStatusID, *conditions: ColumnElement[bool]
+) -> Task | None:
+    """Обновление статуса задачи, возвращает None если под условия не попала ни одна задача."""
+    values = {
+        "task_status_id": task_status.id,
+        "completed_at": _completed_at_transition(task_status.id, Task.completed_at),
+    }
+    return await _update_task(session, conditions, values)
 
-    task.task_status_id = task_status.id
 
+async def create_tasks_repo(session: AsyncSession, new_tasks: Sequence[CreateTask], user_id: UUID) -> Sequence[Task]:
+    """Создание нескольких задач многострочным INSERT ... RETURNING в одной транзакции.
+
+    Задачи возвращаются в том же порядке, что и new_tasks.
+    """
+    stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+    results = await session.scalars(stmt, [new_task.model_dump() | {"user_id": user_id} for new_task in new_tasks])
+    tasks = results.all()
+    await session.commit()
+    return tasks
+
+
+def _batch_update_query(fields: frozenset[str], rows: Sequence[dict], user_id: UUID) -> Update:
+    """Запрос UPDATE ... FROM (VALUES ...) RETURNING, изменяющий одинаковый набор полей у нескольких задач пользователя.
+
+    Если меняется статус без completed_at, время выполнения проставляется или снимается
+    по текущему статусу каждой задачи, как при изменении статуса одной задачи.
+    """
+    names = ["id", *sorted(fields - {"id"})]
+    batch = values(*(column(name, Task.__table__.c[name].type) for name in names), name="batch").data(
+        [tuple(row[name] for name in names) for row in rows]
+    )
+    task_values = {name: cast(batch.c[name], Task.__table__.c[name].type) for name in names[1:]}
+    if "task_status_id" in fields and "completed_at" not in fields:
+        task_status_id = task_values["task_status_id"]
+        task_values["completed_at"] = case(
+            (
+                and_(Task.task_status_id == NOT_COMPLETED_TASK_STATUS_ID, task_status_id == COMPLETED_TASK_STATUS_ID),
+                func.now(),
+            ),
+            (
+                and_(Task.task_status_id == COMPLETED_TASK_STATUS_ID, task_status_id == NOT_COMPLETED_TASK_STATUS_ID),
+                null(),
+            ),
+            else_=Task.completed_at,
+        )
+    return (
+        update(Task)
+        .where(Task.id == batch.c.id, Task.user_id == user_id)
+        .values(**task_values)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def update_tasks_repo(
+    session: AsyncSession, updates: Sequence[PartialUpdateTaskInBatch], user_id: UUID
+) -> dict[UUID, Task]:
+    """Частичное обновление нескольких задач пользователя в одной транзакции.
+
+    Обновления с одинаковым набором полей выполняются одним запросом. Возвращает измененные задачи по id,
+    задач других пользователей и несуществующих задач в результате нет.
+    """
+    groups: defaultdict[frozenset[str], list[dict]] = defaultdict(list)
+    for task_update in updates:
+        task_data = task_update.model_dump(exclude_unset=True)
+        groups[frozenset(task_data)].append(task_data)
+    tasks = {}
+    for fields, rows in groups.items():
+        results = await session.scalars(_batch_update_query(fields, rows, user_id))
+        tasks.update((task.id, task) for task in results)
+    await session.commit()
+    return tasks
+
+
+async def delete_tasks_repo(session: AsyncSession, task_ids: Sequence[UUID], user_id: UUID) -> set[UUID]:
+    """Удаление нескольких задач пользователя одним запросом, возвращает id удаленных задач."""
+    ids = bindparam("task_ids", list(task_ids), type_=ARRAY(Task.__table__.c.id.type))
+    stmt = delete(Task).where(Task.id == any_(ids), Task.user_id == user_id).returning(Task.id)
+    results = await session.scalars(stmt)
+    deleted = set(results)
+    await session.commit()
+    return deleted
+
+
+def _utc_day(column: ColumnElement[datetime]) -> ColumnElement:
+    """День по UTC для даты со временем, так же день считают триггеры счетчиков по дням."""
+    return cast(func.timezone(literal_column("'UTC'"), column), Date)
+
+
+async def get_task_stats_repo(session: AsyncSession, user_id: UUID, now: datetime) -> dict:
+    """Статистика задач пользователя по счетчикам, которые триггеры обновляют при каждом изменении задач.
+
+    Количество задач по статусам и выполненные задачи за последние 30 дней читаются из счетчиков,
+    сколько бы задач ни было у пользователя. Просроченные задачи складываются из счетчиков по дням срока
+    до сегодняшнего и задач со сроком, истекшим сегодня, которые считаются по индексу срока выполнения.
+    Обнулившиеся счетчики по дням триггеры удаляют, поэтому сумма просроченных задач читает не больше строк,
+    чем различных дней срока у невыполненных задач пользователя, а не строку за каждый прошедший день.
+    """
+    today = now.astimezone(timezone.utc).date()
+    day_start = datetime.combine(today, time.min, tzinfo=timezone.utc)
+
+    status_results = await session.execute(
+        select(TaskCounter.task_status_id, TaskCounter.count).where(TaskCounter.user_id == user_id)
+    )
+    by_status = {task_status_id: count for task_status_id, count in status_results.all()}
+
+    completion_results = await session.execute(
+        select(TaskCompletionCounter.day, TaskCompletionCounter.count).where(
+            TaskCompletionCounter.user_id == user_id, TaskCompletionCounter.day > today - timedelta(days=30)
+        )
+    )
+    completions = completion_results.all()
+
+    overdue_before_today = (
+        select(func.coalesce(func.sum(TaskDeadlineCounter.count), 0))
+        .where(TaskDeadlineCounter.user_id == user_id, TaskDeadlineCounter.day < today)
+        .scalar_subquery()
+    )
+    overdue_today = (
+        select(func.count())
+        .select_from(Task)
+        .where(
+            Task.user_id == user_id,
+            Task.complete_before >= day_start,
+            Task.complete_before < now,
+            Task.task_status_id != COMPLETED_TASK_STATUS_ID,
+        )
+        .scalar_subquery()
+    )
+    overdue_results = await session.execute(select(overdue_before_today + overdue_today))
+
+    total = sum(by_status.values())
+    return {
+        "total": total,
+        "by_status": by_status,
+        "overdue": overdue_results.scalar(),
+        "completed_today": sum(count for day, count in completions if day == today),
+        "completed_last_7_days": sum(count for day, count in completions if day > today - timedelta(days=7)),
+        "completed_last_30_days": sum(count for _, count in completions),
+        "completion_rate": by_status.get(COMPLETED_TASK_STATUS_ID, 0) / total if total else None,
+    }
+
+
+async def rebuild_task_stats_repo(session: AsyncSession, user_id: UUID | None = None) -> None:
+    """Пересчитывает с нуля счетчики задач всех пользователей или одного пользователя.
+
+    На время пересчета таблица задач блокируется от изменений, чтобы триггеры параллельных транзакций
+    не изменили счетчики между удалением и новым подсчетом.
+    """
+    connection = await session.connection()
+    await connection.execute(text("LOCK TABLE tasks IN SHARE MODE"))
+    counters = (
+        (TaskCounter, {"task_status_id": Task.task_status_id}, ()),
+        (
+            TaskDeadlineCounter,
+            {"day": _utc_day(Task.complete_before)},
+            (Task.complete_before.is_not(None), Task.task_status_id != COMPLETED_TASK_STATUS_ID),
+        ),
+        (TaskCompletionCounter, {"day": _utc_day(Task.completed_at)}, (Task.completed_at.is_not(None),)),
+    )
+    for counter, keys, conditions in counters:
+        stale = delete(counter)
+        if user_id is not None:
+            stale = stale.where(counter.user_id == user_id)
+            conditions = (*conditions, Task.user_id == user_id)
+        columns = [Task.user_id, *keys.values()]
+        await session.execute(stale)
+        await session.execute(
+            insert(counter).from_select(
+                ["user_id", *keys, "count"], select(*columns, func.count()).where(*conditions).group_by(*columns)
+            )
+        )
     await session.commit()
-    await session.refresh(task)
-    return task
@@ -0,0 +1,84 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime
+from uuid import UUID
+
+from pydantic_core import to_json
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.tasks.formats import TaskFileFormat
+from app.constants import TASK_EXPORT_BATCH_SIZE, TASK_EXPORT_CHUNK_SIZE
+from app.db.models import Task
+
+# Колонки файла экспорта, файл можно загрузить обратно через импорт
+TASK_EXPORT_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.task_status_id,
+    Task.complete_before,
+    Task.completed_at,
+    Task.created_at,
+    Task.updated_at,
+)
+
+
+def write_ndjson(rows: Sequence[Row]) -> bytes:
+    """Строки NDJSON для пачки задач."""
+    return b"".join(to_json(row._asdict()) + b"\n" for row in rows)
+
+
+def write_csv(records: Iterable[Iterable]) -> bytes:
+    """Строки CSV для пачки задач, даты записываются в ISO 8601."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in record] for record in records
+    )
+    return buffer.getvalue().encode()
+
+
+TASK_FILE_WRITERS: dict[str, Callable[[Sequence[Row]], bytes]] = {
+    "ndjson": write_ndjson,
+    "csv": write_csv,
+}
+# Начало файла экспорта до первой задачи
+TASK_FILE_HEADERS: dict[str, bytes] = {
+    "ndjson": b"",
+    "csv": write_csv([[column.key for column in TASK_EXPORT_COLUMNS]]),
+}
+
+
+async def export_tasks(
+    session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+    user_id: UUID,
+    file_format: TaskFileFormat,
+) -> AsyncIterator[bytes]:
+    """Выгружает все задачи пользователя частями по TASK_EXPORT_CHUNK_SIZE байт.
+
+    Задачи читаются серверным курсором пачками по TASK_EXPORT_BATCH_SIZE в собственной сессии из session_factory,
+    так как сессия зависимости закрывается до отправки ответа. Следующая пачка читается только после
+    отправки предыдущих частей клиенту, поэтому медленный клиент замедляет чтение из базы,
+    а память не зависит от количества задач.
+    """
+    write = TASK_FILE_WRITERS[file_format]
+    stmt = (
+        select(*TASK_EXPORT_COLUMNS)
+        .where(Task.user_id == user_id)
+        .order_by(Task.created_at, Task.id)
+        .execution_options(yield_per=TASK_EXPORT_BATCH_SIZE)
+    )
+    async with session_factory() as session:
+        results = await session.stream(stmt)
+        pending = TASK_FILE_HEADERS[file_format]
+        async for rows in results.partitions():
+            data = pending + write(rows)
+            end = len(data) - len(data) % TASK_EXPORT_CHUNK_SIZE
+            for start in range(0, end, TASK_EXPORT_CHUNK_SIZE):
+                yield data[start : start + TASK_EXPORT_CHUNK_SIZE]
+            pending = data[end:]
+        if pending:
+            yield pending
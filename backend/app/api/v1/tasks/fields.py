@@ -0,0 +1,55 @@
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.api.v1.classifiers.registry import classifier_registry
+from app.db.models import Task
+
+# Колонки, которые нужно загрузить для каждого поля ответа задачи
+TASK_FIELD_COLUMNS: dict[str, tuple[InstrumentedAttribute, ...]] = {
+    "id": (Task.id,),
+    "title": (Task.title,),
+    "description": (Task.description,),
+    "complete_before": (Task.complete_before,),
+    "completed_at": (Task.completed_at,),
+    "created_at": (Task.created_at,),
+    "updated_at": (Task.updated_at,),
+    "task_status": (Task.task_status_id,),
+}
+# Поля задачи в списках и при чтении одной задачи
+TASK_LIST_FIELDS = frozenset(TASK_FIELD_COLUMNS) - {"description"}
+TASK_DETAIL_FIELDS = frozenset(TASK_FIELD_COLUMNS)
+
+
+def parse_fields(fields: str | None, allowed: frozenset[str]) -> frozenset[str] | None:
+    """Разбирает список полей через запятую, None - все поля."""
+    if not fields:
+        return None
+    selected = frozenset(field.strip() for field in fields.split(",") if field.strip())
+    unknown = selected - allowed
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def task_columns(fields: Iterable[str], *required: InstrumentedAttribute) -> list[InstrumentedAttribute]:
+    """Колонки задачи, которые нужно загрузить для полей ответа, и обязательные колонки."""
+    columns = dict.fromkeys(required)
+    for field in fields:
+        columns.update(dict.fromkeys(TASK_FIELD_COLUMNS[field]))
+    return list(columns)
+
+
+def sparse_task(task: Task, fields: frozenset[str], detail: bool = False) -> dict[str, Any]:
+    """Представление задачи только с запрошенными полями."""
+    data = {}
+    for field in TASK_FIELD_COLUMNS:
+        if field not in fields:
+            continue
+        if field == "task_status":
+            task_status = classifier_registry.get_task_status(task.task_status_id)
+            data[field] = task_status if detail else {"name": task_status.name}
+        else:
+            data[field] = getattr(task, field)
+    return data
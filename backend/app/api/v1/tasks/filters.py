@@ -0,0 +1,97 @@
+import operator
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal, get_args
+
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.operators import ColumnOperators
+
+from app.api.v1.tasks.fields import TASK_LIST_FIELDS, parse_fields
+from app.db.models import Task
+
+# Поля, по которым разрешена сортировка списка задач
+TaskSortField = Literal["title", "created_at", "updated_at", "complete_before", "completed_at"]
+
+# Индексы (user_id, поле, id), обслуживающие сортировку и постраничный вывод по курсору
+TASK_SORTS: dict[str, str] = {sort_field: f"ix_tasks_user_id_{sort_field}_id" for sort_field in get_args(TaskSortField)}
+
+
+@dataclass(frozen=True, slots=True)
+class TaskFilter:
+    """Фильтр списка задач: параметр запроса, условие на колонку и индекс, которым оно обслуживается."""
+
+    param: str
+    column: InstrumentedAttribute
+    operator: Callable[[Any, Any], ColumnElement[bool]]
+    index: str
+
+    def condition(self, value: Any) -> ColumnElement[bool]:
+        """Условие фильтра для значения параметра."""
+        return self.operator(self.column, value)
+
+
+# Все доступные фильтры списка задач, каждый фильтр должен обслуживаться индексом вместе с условием по user_id
+TASK_FILTERS = (
+    TaskFilter("title", Task.title, ColumnOperators.icontains, "ix_tasks_title_trgm"),
+    TaskFilter("task_status_id", Task.task_status_id, operator.eq, "ix_tasks_user_id_task_status_id"),
+    TaskFilter("created_from", Task.created_at, operator.ge, TASK_SORTS["created_at"]),
+    TaskFilter("created_to", Task.created_at, operator.lt, TASK_SORTS["created_at"]),
+    TaskFilter("complete_before_from", Task.complete_before, operator.ge, TASK_SORTS["complete_before"]),
+    TaskFilter("complete_before_to", Task.complete_before, operator.lt, TASK_SORTS["complete_before"]),
+    TaskFilter("completed_from", Task.completed_at, operator.ge, TASK_SORTS["completed_at"]),
+    TaskFilter("completed_to", Task.completed_at, operator.lt, TASK_SORTS["completed_at"]),
+)
+
+
+class TaskListParams(BaseModel):
+    """Параметры списка задач: фильтры, сортировка, пагинация и подсчет количества."""
+
+    title: str | None = Field(None, title="Поиск подстроки в названии задачи")
+    task_status_id: int | None = Field(None, title="Фильтр по статусу задачи")
+    created_from: datetime | None = Field(None, title="Создана не раньше")
+    created_to: datetime | None = Field(None, title="Создана раньше")
+    complete_before_from: datetime | None = Field(None, title="Срок выполнения не раньше")
+    complete_before_to: datetime | None = Field(None, title="Срок выполнения раньше")
+    completed_from: datetime | None = Field(None, title="Выполнена не раньше")
+    completed_to: datetime | None = Field(None, title="Выполнена раньше")
+    sort_field: TaskSortField = Field("created_at", title="Поле для сортировки")
+    sort_direction: Literal["asc", "desc"] = Field("desc", title="Порядок сортировки asc или desc")
+    limit: int = Field(10, ge=1, le=100, title="Количество записей на страницу")
+    offset: int = Field(0, ge=0, title="Смещение")
+    cursor: str | None = Field(None, title="Курсор страницы из next_cursor предыдущего ответа")
+    count: Literal["exact", "estimate", "none"] = Field(
+        "exact", title="Подсчет количества задач: точный, оценка по статистике или без подсчета"
+    )
+    fields: str | None = Field(None, title="Поля задач в ответе через запятую", examples=["id,title,task_status"])
+
+    @field_validator("fields")
+    @classmethod
+    def validate_fields(cls, fields: str | None) -> str | None:
+        """Проверяет что запрошены только существующие поля."""
+        parse_fields(fields, TASK_LIST_FIELDS)
+        return fields
+
+    @property
+    def selected_fields(self) -> frozenset[str] | None:
+        """Запрошенные поля задач, None - все поля."""
+        return parse_fields(self.fields, TASK_LIST_FIELDS)
+
+    def active_filters(self) -> list[tuple[TaskFilter, Any]]:
+        """Фильтры, для которых переданы значения."""
+        return [
+            (task_filter, getattr(self, task_filter.param))
+            for task_filter in TASK_FILTERS
+            if getattr(self, task_filter.param) not in (None, "")
+        ]
+
+    def conditions(self) -> list[ColumnElement[bool]]:
+        """Условия отбора задач по переданным фильтрам."""
+        return [task_filter.condition(value) for task_filter, value in self.active_filters()]
+
+    @property
+    def countable_by_counters(self) -> bool:
+        """Можно ли получить количество задач из счетчиков, они ведутся только в разрезе статуса."""
+        return all(task_filter.param == "task_status_id" for task_filter, _ in self.active_filters())
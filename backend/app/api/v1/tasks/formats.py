@@ -0,0 +1,10 @@
+from typing import Literal
+
+# Форматы файлов импорта и экспорта задач
+TaskFileFormat = Literal["ndjson", "csv"]
+
+# Типы содержимого файлов задач
+TASK_FILE_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
@@ -0,0 +1,175 @@
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from typing import Any
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.sqltypes import DATETIME_TIMEZONE
+
+from app.api.v1.classifiers.registry import classifier_registry
+from app.api.v1.tasks.formats import TaskFileFormat
+from app.api.v1.tasks.schemas import CreateTask, RejectedTaskRow, TaskImportReport
+from app.constants import MAX_TASK_IMPORT_ERRORS_IN_REPORT, MAX_TASK_IMPORT_LINE_LENGTH
+from app.db.models import Task
+
+# Временная таблица для загрузки задач через COPY, удаляется при завершении транзакции
+task_import_table = Table(
+    "task_import",
+    MetaData(),
+    Column("title", String(255)),
+    Column("description", String),
+    Column("task_status_id", Integer),
+    Column("complete_before", DATETIME_TIMEZONE),
+    Column("completed_at", DATETIME_TIMEZONE),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+TASK_IMPORT_COLUMNS = [column.name for column in task_import_table.columns]
+
+
+async def read_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Строки потока в UTF-8 с их номерами, в памяти держится только текущая строка."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            number += 1
+            yield number, line.removesuffix("\r")
+        if len(pending) > MAX_TASK_IMPORT_LINE_LENGTH:
+            raise ValueError(f"Строка {number + 1} длиннее {MAX_TASK_IMPORT_LINE_LENGTH} символов")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield number + 1, pending.removesuffix("\r")
+
+
+async def read_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str, Any]]:
+    """Записи NDJSON: номер строки, исходный текст и разобранное значение или ValueError."""
+    async for number, line in read_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield number, line, json.loads(line)
+        except ValueError as error:
+            yield number, line, ValueError(f"Некорректный JSON: {error}")
+
+
+async def read_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str, Any]]:
+    """Записи CSV с заголовком: номер первой строки записи, исходный текст и словарь значений.
+
+    Запись заканчивается на строке, после которой все кавычки закрыты, поэтому значения в кавычках
+    могут содержать переводы строк. Пустые значения считаются отсутствующими.
+    """
+    header = None
+    record = ""
+    start = 0
+    async for number, line in read_lines(chunks):
+        if not record:
+            if not line.strip():
+                continue
+            start = number
+            record = line
+        else:
+            record += "\n" + line
+        if record.count('"') % 2:
+            if len(record) > MAX_TASK_IMPORT_LINE_LENGTH:
+                raise ValueError(f"Запись со строки {start} длиннее {MAX_TASK_IMPORT_LINE_LENGTH} символов")
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+        elif len(values) != len(header):
+            yield start, record, ValueError(f"Ожидалось {len(header)} значений, получено {len(values)}")
+        else:
+            yield start, record, {name: value for name, value in zip(header, values) if value != ""}
+        record = ""
+    if record:
+        raise ValueError(f"Не закрыта кавычка в записи со строки {start}")
+    if header is None:
+        raise ValueError("В файле нет заголовка CSV")
+
+
+TASK_FILE_READERS: dict[str, Callable[[AsyncIterable[bytes]], AsyncIterator[tuple[int, str, Any]]]] = {
+    "ndjson": read_ndjson,
+    "csv": read_csv,
+}
+
+
+def _validation_detail(error: ValidationError) -> str:
+    """Краткое описание ошибок валидации записи."""
+    return "; ".join(f"{'.'.join(map(str, item['loc'])) or 'row'}: {item['msg']}" for item in error.errors())
+
+
+def validate_task_row(value: Any) -> CreateTask:
+    """Проверяет запись файла импорта как новую задачу, ошибки возвращаются в ValueError."""
+    if isinstance(value, ValueError):
+        raise value
+    try:
+        new_task = CreateTask.model_validate(value)
+    except ValidationError as error:
+        raise ValueError(_validation_detail(error)) from None
+    if not classifier_registry.has_task_status(new_task.task_status_id):
+        raise ValueError(f"task_status_id: статус задачи {new_task.task_status_id} не найден")
+    return new_task
+
+
+async def import_tasks(
+    session: AsyncSession,
+    user_id: UUID,
+    chunks: AsyncIterable[bytes],
+    file_format: TaskFileFormat,
+    *,
+    on_reject: Callable[[RejectedTaskRow], None] | None = None,
+    on_progress: Callable[[TaskImportReport], None] | None = None,
+    progress_interval: int = 10000,
+) -> TaskImportReport:
+    """Импортирует задачи пользователя из потока CSV или NDJSON в одной транзакции.
+
+    Записи проверяются по мере чтения и одним COPY загружаются во временную таблицу, откуда переносятся
+    в tasks одним INSERT ... SELECT. Ни файл, ни задачи целиком в памяти не хранятся.
+    Отклоненные записи передаются в on_reject, первые из них попадают в отчет. on_progress вызывается
+    каждые progress_interval прочитанных записей. Если файл нельзя прочитать, выбрасывается ValueError
+    и ни одна задача не создается.
+    """
+    report = TaskImportReport()
+
+    async def records() -> AsyncIterator[tuple]:
+        async for line, row, value in TASK_FILE_READERS[file_format](chunks):
+            report.total += 1
+            try:
+                new_task = validate_task_row(value)
+            except ValueError as error:
+                report.rejected += 1
+                rejected = RejectedTaskRow(line=line, detail=str(error), row=row)
+                if len(report.errors) < MAX_TASK_IMPORT_ERRORS_IN_REPORT:
+                    report.errors.append(rejected)
+                if on_reject is not None:
+                    on_reject(rejected)
+            else:
+                yield tuple(getattr(new_task, name) for name in TASK_IMPORT_COLUMNS)
+            if on_progress is not None and report.total % progress_interval == 0:
+                on_progress(report)
+
+    connection = await session.connection()
+    await connection.run_sync(task_import_table.create)
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        task_import_table.name, records=records(), columns=TASK_IMPORT_COLUMNS
+    )
+    stmt = insert(Task).from_select(
+        [*TASK_IMPORT_COLUMNS, "user_id"],
+        select(*task_import_table.columns, literal(user_id, Task.__table__.c.user_id.type)),
+        include_defaults=False,
+    )
+    results = await session.execute(stmt)
+    report.imported = results.rowcount
+    await session.commit()
+    if on_progress is not None:
+        on_progress(report)
+    return report
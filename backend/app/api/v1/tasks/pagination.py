@@ -0,0 +1,68 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, DateTime, and_, tuple_
+
+from app.db.models import Task
+
+
+@dataclass(frozen=True, slots=True)
+class Cursor:
+    """Позиция в списке задач: значение поля сортировки и id последней задачи страницы."""
+
+    sort_field: str
+    sort_direction: str
+    value: Any
+    id: UUID
+
+
+def encode_cursor(task: Task, sort_field: str, sort_direction: str) -> str:
+    """Кодирует позицию после задачи в непрозрачную строку."""
+    value = getattr(task, sort_field)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    data = json.dumps([sort_field, sort_direction, value, str(task.id)], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_field: str, sort_direction: str) -> Cursor:
+    """Разбирает курсор, полученный от клиента, курсор должен соответствовать текущей сортировке."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort_field, cursor_sort_direction, value, task_id = json.loads(data)
+        task_id = UUID(task_id)
+        if value is not None and isinstance(Task.__table__.c[sort_field].type, DateTime):
+            value = datetime.fromisoformat(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор")
+    if (cursor_sort_field, cursor_sort_direction) != (sort_field, sort_direction):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Курсор получен для другой сортировки")
+    return Cursor(sort_field=sort_field, sort_direction=sort_direction, value=value, id=task_id)
+
+
+def keyset_conditions(cursor: Cursor) -> list[ColumnElement[bool]]:
+    """Условия отбора задач, идущих после курсора, по одному на каждый оставшийся сегмент списка.
+
+    Порядок совпадает с порядком по умолчанию в PostgreSQL: NULL значения идут последними при сортировке
+    по возрастанию и первыми при сортировке по убыванию. Поэтому одного индекса (user_id, поле, id)
+    достаточно для обоих направлений. Задачи с NULL и с заполненным полем сортировки образуют в индексе
+    два отдельных сегмента, и условие через OR по обоим сегментам не укладывается в один диапазон индекса.
+    Поэтому каждое условие описывает один диапазон индекса, а следующий сегмент читается, только если
+    в предыдущем не хватило задач на страницу.
+    """
+    column = getattr(Task, cursor.sort_field)
+    nullable = Task.__table__.c[cursor.sort_field].nullable
+    if cursor.sort_direction == "asc":
+        if cursor.value is None:
+            return [and_(column.is_(None), Task.id > cursor.id)]
+        conditions = [tuple_(column, Task.id) > tuple_(cursor.value, cursor.id)]
+        return [*conditions, column.is_(None)] if nullable else conditions
+    if cursor.value is None:
+        return [and_(column.is_(None), Task.id < cursor.id), column.is_not(None)]
+    return [tuple_(column, Task.id) < tuple_(cursor.value, cursor.id)]
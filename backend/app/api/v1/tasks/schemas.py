@@ -2,9 +2,11 @@ from datetime import datetime
 from typing import Sequence
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, computed_field, field_validator
 
+from app.api.v1.classifiers.registry import classifier_registry
 from app.api.v1.classifiers.schemas import BaseTaskStatus, ReadTaskStatus
+from app.constants import MAX_TASKS_IN_BATCH
 
 
 class BaseTask(BaseModel):
@@ -24,7 +26,13 @@ class ReadTask(BaseTask):
     description: str
     created_at: datetime
     updated_at: datetime | None
-    task_status: ReadTaskStatus
+    task_status_id: int = Field(exclude=True)
+
+    @computed_field
+    @property
+    def task_status(self) -> ReadTaskStatus:
+        """Статус задачи из реестра классификаторов."""
+        return classifier_registry.get_task_status(self.task_status_id)
 
 
 class ReadTaskList(BaseTask):
@@ -33,14 +41,38 @@ class ReadTaskList(BaseTask):
     id: UUID
     created_at: datetime
     updated_at: datetime | None
-    task_status: BaseTaskStatus
+    task_status_id: int = Field(exclude=True)
+
+    @computed_field
+    @property
+    def task_status(self) -> BaseTaskStatus:
+        """Статус задачи из реестра классификаторов."""
+        return classifier_registry.get_task_status(self.task_status_id)
 
 
 class PaginatedTaskList(BaseModel):
     """Сериализатор пагинации списка задач."""
 
-    count: int
+    count: int | None = Field(description="Количество задач, None если подсчет не запрашивался")
     results: Sequence[ReadTaskList]
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы, None если страница последняя")
+
+
+class TaskSearchResult(BaseModel):
+    """Найденная задача с рангом и подсвеченными фрагментами."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    task: ReadTaskList = Field(validation_alias="Task")
+    rank: float
+    title_highlight: str = Field(description="Фрагменты заголовка в HTML: текст экранирован, совпадения в <b>")
+    description_highlight: str = Field(description="Фрагменты описания в HTML: текст экранирован, совпадения в <b>")
+
+
+class TaskSearchResults(BaseModel):
+    """Результаты полнотекстового поиска задач, отсортированные по рангу."""
+
+    results: Sequence[TaskSearchResult]
 
 
 class CreateTask(BaseTask):
@@ -54,3 +86,118 @@ class UpdateTask(CreateTask):
     """Сериализатор обновления задачи."""
 
     pass
+
+
+class PartialUpdateTaskInBatch(BaseModel):
+    """Частичное обновление задачи в пакетном запросе, изменяются только переданные поля."""
+
+    id: UUID
+    title: str | None = Field(None, max_length=255, min_length=5)
+    description: str | None = Field(None, min_length=5)
+    task_status_id: int | None = None
+    complete_before: datetime | None = None
+    completed_at: datetime | None = None
+
+    @field_validator("title", "description", "task_status_id")
+    @classmethod
+    def validate_not_null(cls, value: str | int | None) -> str | int:
+        """Запрещает явно передавать null в обязательные поля задачи."""
+        if value is None:
+            raise ValueError("Поле не может быть null")
+        return value
+
+
+def _validate_unique_ids(ids: Sequence[UUID]) -> None:
+    """Проверяет что задача встречается в пакете не больше одного раза."""
+    if len(set(ids)) != len(ids):
+        raise ValueError("Идентификаторы задач в пакете повторяются")
+
+
+class CreateTaskBatch(BaseModel):
+    """Пакет новых задач."""
+
+    tasks: list[CreateTask] = Field(..., min_length=1, max_length=MAX_TASKS_IN_BATCH)
+
+
+class UpdateTaskBatch(BaseModel):
+    """Пакет частичных обновлений задач."""
+
+    tasks: list[PartialUpdateTaskInBatch] = Field(..., min_length=1, max_length=MAX_TASKS_IN_BATCH)
+
+    @field_validator("tasks")
+    @classmethod
+    def validate_unique_tasks(cls, tasks: list[PartialUpdateTaskInBatch]) -> list[PartialUpdateTaskInBatch]:
+        """Одна задача может изменяться в пакете только один раз."""
+        _validate_unique_ids([task.id for task in tasks])
+        return tasks
+
+
+class DeleteTaskBatch(BaseModel):
+    """Пакет идентификаторов удаляемых задач."""
+
+    ids: list[UUID] = Field(..., min_length=1, max_length=MAX_TASKS_IN_BATCH)
+
+    @field_validator("ids")
+    @classmethod
+    def validate_unique_ids(cls, ids: list[UUID]) -> list[UUID]:
+        """Одна задача может удаляться в пакете только один раз."""
+        _validate_unique_ids(ids)
+        return ids
+
+
+class TaskBatchItemResult(BaseModel):
+    """Результат обработки одного элемента пакета, порядок результатов совпадает с порядком элементов."""
+
+    status: int = Field(description="HTTP код результата для элемента")
+    id: UUID | None = Field(None, description="Идентификатор задачи, None если задача не создана")
+    task: ReadTask | None = Field(None, description="Задача после изменения, None при ошибке и удалении")
+    detail: str | None = Field(None, description="Описание ошибки")
+
+
+class TaskBatchResults(BaseModel):
+    """Результаты пакетного запроса."""
+
+    results: Sequence[TaskBatchItemResult]
+
+
+class RejectedTaskRow(BaseModel):
+    """Запись файла импорта, не прошедшая проверку."""
+
+    line: int = Field(description="Номер строки файла, с которой начинается запись")
+    detail: str = Field(description="Описание ошибки")
+    row: str = Field(description="Исходный текст записи")
+
+
+class TaskImportReport(BaseModel):
+    """Отчет об импорте задач."""
+
+    total: int = Field(0, description="Количество прочитанных записей")
+    imported: int = Field(0, description="Количество созданных задач")
+    rejected: int = Field(0, description="Количество отклоненных записей")
+    errors: list[RejectedTaskRow] = Field(default_factory=list, description="Первые отклоненные записи")
+
+
+class TaskStatusCount(BaseModel):
+    """Количество задач в статусе."""
+
+    task_status: ReadTaskStatus
+    count: int
+
+
+class TaskStats(BaseModel):
+    """Статистика задач пользователя."""
+
+    total: int = Field(description="Количество задач")
+    by_status: list[TaskStatusCount] = Field(description="Количество задач по статусам")
+    overdue: int = Field(description="Количество невыполненных задач с истекшим сроком выполнения")
+    completed_today: int = Field(description="Выполнено задач с начала дня по UTC")
+    completed_last_7_days: int = Field(description="Выполнено задач за 7 дней, включая текущий")
+    completed_last_30_days: int = Field(description="Выполнено задач за 30 дней, включая текущий")
+    completion_rate: float | None = Field(description='Доля задач в статусе "Выполнено", None если задач нет')
+
+
+# Заранее собранные схемы для сериализации ответов
+read_task_adapter = TypeAdapter(ReadTask)
+paginated_task_list_adapter = TypeAdapter(PaginatedTaskList)
+task_search_results_adapter = TypeAdapter(TaskSearchResults)
+task_batch_results_adapter = TypeAdapter(TaskBatchResults)
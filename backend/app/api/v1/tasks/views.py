@@ -1,20 +1,69 @@
+from datetime import datetime, timezone
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.api.v1.auth.principal import Principal
+from app.api.v1.classifiers.registry import classifier_registry
 from app.api.v1.classifiers.schemas import TaskStatusID
-from app.api.v1.dependencies.tasks import get_task_by_id_for_current_user
-from app.api.v1.dependencies.users import get_current_user
+from app.api.v1.dependencies.conditional import (
+    IfModifiedSince,
+    IfNoneMatch,
+    is_not_modified,
+    task_etag,
+    task_version,
+    validator_headers,
+)
+from app.api.v1.dependencies.tasks import (
+    TaskWriteScope,
+    get_task_by_id_for_current_user_for_read,
+    get_task_write_scope,
+    task_detail_fields,
+)
+from app.api.v1.dependencies.users import get_current_principal, get_current_principal_for_write
+from app.api.v1.responses import json_response, raw_json_response
 from app.api.v1.tasks import crud
-from app.api.v1.tasks.schemas import CreateTask, PaginatedTaskList, ReadTask, UpdateTask
-from app.constants import DEFAULT_RESPONSES
+from app.api.v1.tasks.exporting import export_tasks
+from app.api.v1.tasks.fields import sparse_task
+from app.api.v1.tasks.filters import TaskListParams
+from app.api.v1.tasks.formats import TASK_FILE_MEDIA_TYPES, TaskFileFormat
+from app.api.v1.tasks.importing import import_tasks
+from app.api.v1.tasks.pagination import decode_cursor, encode_cursor
+from app.api.v1.tasks.schemas import (
+    CreateTask,
+    CreateTaskBatch,
+    DeleteTaskBatch,
+    PaginatedTaskList,
+    ReadTask,
+    TaskBatchResults,
+    TaskImportReport,
+    TaskSearchResults,
+    TaskStats,
+    TaskStatusCount,
+    UpdateTask,
+    UpdateTaskBatch,
+    paginated_task_list_adapter,
+    read_task_adapter,
+    task_batch_results_adapter,
+    task_search_results_adapter,
+)
+from app.constants import DEFAULT_RESPONSES, NOT_MODIFIED_RESPONSES, PRECONDITION_FAILED_RESPONSES
 from app.db import db_helper
-from app.db.models import Task, User
+from app.db.models import Task
 
 router = APIRouter(tags=["tasks"])
 
+# Результаты элементов пакета, не найденных у пользователя или с несуществующим статусом
+TASK_NOT_FOUND_RESULT = {"status": status.HTTP_404_NOT_FOUND, "detail": "Задача не найдена"}
+UNKNOWN_TASK_STATUS_RESULT = {"status": status.HTTP_422_UNPROCESSABLE_ENTITY, "detail": "Статус задачи не найден"}
+
+
+def _has_task_status(task_status_id: int | None) -> bool:
+    """Проверяет статус элемента пакета, None означает что статус не изменяется."""
+    return task_status_id is None or classifier_registry.has_task_status(task_status_id)
+
 
 @router.post(
     "/",
@@ -24,89 +73,288 @@ router = APIRouter(tags=["tasks"])
 async def create_task(
     new_task: CreateTask,
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_principal_for_write)],
 ) -> Task:
     """Создание новой задачи."""
     return await crud.create_task_repo(session, new_task, user.id)
 
 
-@router.get("/", response_model=PaginatedTaskList, responses=DEFAULT_RESPONSES)
+@router.get(
+    "/",
+    response_model=PaginatedTaskList,
+    responses=DEFAULT_RESPONSES | {status.HTTP_400_BAD_REQUEST: {"description": "Некорректный курсор"}},
+)
 async def get_task_list_for_user(
-    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-    user: Annotated[User, Depends(get_current_user)],
-    title: Annotated[str | None, Query(title="Поиск по названию задачи")] = None,
-    task_status_id: Annotated[int | None, Query(title="Фильтр по статусу задачи")] = None,
-    sort_field: Annotated[str | None, Query(title="Поле для сортировки")] = None,
-    sort_direction: Annotated[str, Query(title="Порядок сортировки asc или desc", enum=["asc", "desc"])] = "desc",
+    session: Annotated[AsyncSession, Depends(db_helper.get_read_session)],
+    user: Annotated[Principal, Depends(get_current_principal)],
+    params: Annotated[TaskListParams, Query()],
+) -> PaginatedTaskList | Response:
+    """Получение списка задач для пользователя.
+
+    Для постраничного обхода больших списков используйте cursor из next_cursor предыдущего ответа вместо offset.
+    """
+    if params.cursor is not None and params.offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Нельзя использовать cursor вместе с offset"
+        )
+    cursor = None
+    if params.cursor is not None:
+        cursor = decode_cursor(params.cursor, params.sort_field, params.sort_direction)
+    tasks, tasks_count = await crud.get_tasks_for_user_repo(session, user.id, params, cursor=cursor)
+    next_cursor = None
+    if len(tasks) > params.limit:
+        tasks = tasks[: params.limit]
+        next_cursor = encode_cursor(tasks[-1], params.sort_field, params.sort_direction)
+    fields = params.selected_fields
+    if fields is not None:
+        results = [sparse_task(task, fields) for task in tasks]
+        return raw_json_response({"count": tasks_count, "results": results, "next_cursor": next_cursor})
+    return json_response(
+        paginated_task_list_adapter, {"count": tasks_count, "results": tasks, "next_cursor": next_cursor}
+    )
+
+
+@router.get("/search/", response_model=TaskSearchResults, responses=DEFAULT_RESPONSES)
+async def search_tasks(
+    session: Annotated[AsyncSession, Depends(db_helper.get_read_session)],
+    user: Annotated[Principal, Depends(get_current_principal)],
+    q: Annotated[str, Query(min_length=1, max_length=255, title="Поисковый запрос")],
     limit: Annotated[int, Query(ge=1, le=100, title="Количество записей на страницу")] = 10,
-    offset: Annotated[int, Query(title="Смещение")] = 0,
-) -> PaginatedTaskList:
-    """Получение списка задач для пользователя."""
-    tasks, count = await crud.get_tasks_for_user_repo(
-        session,
-        user.id,
-        joinedload(Task.task_status),
-        title=title,
-        task_status_id=task_status_id,
-        sort_field=sort_field,
-        sort_direction=sort_direction,
-        limit=limit,
-        offset=offset,
+    offset: Annotated[int, Query(ge=0, title="Смещение")] = 0,
+) -> TaskSearchResults | Response:
+    """Полнотекстовый поиск задач по заголовку и описанию.
+
+    Поддерживает синтаксис запросов веб-поиска: фразы в кавычках, OR и исключение слов через минус.
+    Для поиска подстроки в заголовке используйте фильтр title списка задач.
+    """
+    rows = await crud.search_tasks_for_user_repo(session, user.id, q, limit=limit, offset=offset)
+    return json_response(task_search_results_adapter, {"results": rows})
+
+
+@router.post("/batch/", response_model=TaskBatchResults, responses=DEFAULT_RESPONSES)
+async def create_task_batch(
+    batch: CreateTaskBatch,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    user: Annotated[Principal, Depends(get_current_principal_for_write)],
+) -> TaskBatchResults | Response:
+    """Создание нескольких задач одним запросом в одной транзакции.
+
+    Результаты возвращаются в порядке задач в запросе, задачи с несуществующим статусом не создаются.
+    """
+    new_tasks = [new_task for new_task in batch.tasks if _has_task_status(new_task.task_status_id)]
+    created = iter(await crud.create_tasks_repo(session, new_tasks, user.id) if new_tasks else ())
+    results = []
+    for new_task in batch.tasks:
+        if not _has_task_status(new_task.task_status_id):
+            results.append(UNKNOWN_TASK_STATUS_RESULT)
+            continue
+        task = next(created)
+        results.append({"status": status.HTTP_201_CREATED, "id": task.id, "task": task})
+    return json_response(task_batch_results_adapter, {"results": results})
+
+
+@router.patch("/batch/", response_model=TaskBatchResults, responses=DEFAULT_RESPONSES)
+async def update_task_batch(
+    batch: UpdateTaskBatch,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    user: Annotated[Principal, Depends(get_current_principal_for_write)],
+) -> TaskBatchResults | Response:
+    """Частичное обновление нескольких задач одним запросом в одной транзакции.
+
+    Изменяются только переданные поля. При смене статуса без completed_at время выполнения
+    проставляется или снимается так же, как при изменении статуса одной задачи.
+    """
+    updates = [task_update for task_update in batch.tasks if _has_task_status(task_update.task_status_id)]
+    updated = await crud.update_tasks_repo(session, updates, user.id) if updates else {}
+    results = []
+    for task_update in batch.tasks:
+        if not _has_task_status(task_update.task_status_id):
+            results.append(UNKNOWN_TASK_STATUS_RESULT | {"id": task_update.id})
+        elif task_update.id in updated:
+            results.append({"status": status.HTTP_200_OK, "id": task_update.id, "task": updated[task_update.id]})
+        else:
+            results.append(TASK_NOT_FOUND_RESULT | {"id": task_update.id})
+    return json_response(task_batch_results_adapter, {"results": results})
+
+
+@router.delete("/batch/", response_model=TaskBatchResults, responses=DEFAULT_RESPONSES)
+async def delete_task_batch(
+    batch: DeleteTaskBatch,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    user: Annotated[Principal, Depends(get_current_principal_for_write)],
+) -> TaskBatchResults | Response:
+    """Удаление нескольких задач одним запросом."""
+    deleted = await crud.delete_tasks_repo(session, batch.ids, user.id)
+    results = [
+        {"status": status.HTTP_204_NO_CONTENT, "id": task_id}
+        if task_id in deleted
+        else TASK_NOT_FOUND_RESULT | {"id": task_id}
+        for task_id in batch.ids
+    ]
+    return json_response(task_batch_results_adapter, {"results": results})
+
+
+@router.post(
+    "/import/",
+    response_model=TaskImportReport,
+    responses=DEFAULT_RESPONSES | {status.HTTP_400_BAD_REQUEST: {"description": "Файл нельзя прочитать"}},
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": {"type": "string"}} for media_type in TASK_FILE_MEDIA_TYPES.values()},
+        }
+    },
+)
+async def import_task_file(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    user: Annotated[Principal, Depends(get_current_principal_for_write)],
+    file_format: Annotated[TaskFileFormat, Query(alias="format", title="Формат файла")] = "ndjson",
+) -> TaskImportReport:
+    """Импорт задач из CSV или NDJSON, переданного в теле запроса.
+
+    Тело читается потоком, записи проверяются по мере чтения, корректные задачи создаются в одной транзакции.
+    CSV должен начинаться с заголовка с именами полей задачи. Отчет содержит количество созданных задач
+    и первые отклоненные записи.
+    """
+    try:
+        return await import_tasks(session, user.id, request.stream(), file_format)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+
+@router.get(
+    "/export/",
+    response_class=StreamingResponse,
+    responses=DEFAULT_RESPONSES
+    | {
+        status.HTTP_200_OK: {
+            "description": "Файл со всеми задачами пользователя",
+            "content": {media_type: {"schema": {"type": "string"}} for media_type in TASK_FILE_MEDIA_TYPES.values()},
+        }
+    },
+)
+async def export_task_file(
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(db_helper.get_read_session_factory)],
+    user: Annotated[Principal, Depends(get_current_principal)],
+    file_format: Annotated[TaskFileFormat, Query(alias="format", title="Формат файла")] = "ndjson",
+) -> StreamingResponse:
+    """Экспорт всех задач пользователя в NDJSON или CSV.
+
+    Файл передается потоком, задачи упорядочены по дате создания. Полученный файл можно загрузить обратно
+    через импорт задач.
+    """
+    return StreamingResponse(
+        export_tasks(session_factory, user.id, file_format),
+        media_type=TASK_FILE_MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{file_format}"'},
+    )
+
+
+@router.get("/stats/", response_model=TaskStats, responses=DEFAULT_RESPONSES)
+async def get_task_stats(
+    session: Annotated[AsyncSession, Depends(db_helper.get_read_session)],
+    user: Annotated[Principal, Depends(get_current_principal)],
+) -> TaskStats:
+    """Статистика задач пользователя: количество по статусам, просроченные и выполненные за последние дни задачи.
+
+    Статистика читается из счетчиков, которые обновляются при каждом изменении задач,
+    поэтому время ответа не зависит от количества задач.
+    """
+    stats = await crud.get_task_stats_repo(session, user.id, datetime.now(tz=timezone.utc))
+    by_status = stats.pop("by_status")
+    return TaskStats(
+        **stats,
+        by_status=[
+            TaskStatusCount(task_status=task_status, count=by_status.get(task_status.id, 0))
+            for task_status in classifier_registry.task_statuses
+        ],
     )
-    return PaginatedTaskList(count=count, results=tasks)
 
 
 @router.get(
-    "/{task_id}",
+    "/{task_id:uuid}",
     response_model=ReadTask,
-    responses=DEFAULT_RESPONSES | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
+    responses=DEFAULT_RESPONSES
+    | NOT_MODIFIED_RESPONSES
+    | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
 )
 async def get_task(
-    task: Annotated[Task, Depends(get_task_by_id_for_current_user)],
-) -> Task:
-    """Получение задачи по id."""
-    return task
+    task: Annotated[Task, Depends(get_task_by_id_for_current_user_for_read)],
+    fields: Annotated[frozenset[str] | None, Depends(task_detail_fields)],
+    response: Response,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
+) -> ReadTask | Response:
+    """Получение задачи по id.
+
+    Ответ содержит ETag и Last-Modified, при совпадении If-None-Match или If-Modified-Since возвращается 304 без тела.
+    Параметр fields ограничивает поля ответа, ETag от него не зависит.
+    """
+    etag = task_etag(task)
+    headers = validator_headers(etag, task_version(task))
+    if is_not_modified(etag, if_none_match, task_version(task), if_modified_since):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if fields is not None:
+        return raw_json_response(sparse_task(task, fields, detail=True), headers=headers)
+    response.headers.update(headers)
+    return json_response(read_task_adapter, task, headers=headers)
 
 
 @router.delete(
-    "/{task_id}",
-    responses=DEFAULT_RESPONSES | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
+    "/{task_id:uuid}",
+    responses=DEFAULT_RESPONSES
+    | PRECONDITION_FAILED_RESPONSES
+    | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
     status_code=status.HTTP_204_NO_CONTENT,
     response_description="Задача удалена",
 )
 async def delete_task(
-    task: Annotated[Task, Depends(get_task_by_id_for_current_user)],
+    scope: Annotated[TaskWriteScope, Depends(get_task_write_scope)],
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
 ) -> None:
-    """Удаление задачи по id."""
-    await crud.delete_task_repo(session, task)
+    """Удаление задачи по id, при переданном If-Match удаляется только не устаревшая версия."""
+    if not await crud.delete_task_repo(session, *scope.conditions):
+        raise scope.not_found()
 
 
 @router.put(
-    "/{task_id}",
+    "/{task_id:uuid}",
     response_model=ReadTask,
-    responses=DEFAULT_RESPONSES | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
+    responses=DEFAULT_RESPONSES
+    | PRECONDITION_FAILED_RESPONSES
+    | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
 )
 async def update_task(
     update_task: UpdateTask,
-    task: Annotated[Task, Depends(get_task_by_id_for_current_user)],
+    scope: Annotated[TaskWriteScope, Depends(get_task_write_scope)],
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    response: Response,
 ) -> Task:
-    """Полное обновление задачи."""
-    task = await crud.update_task_repo(session, task, update_task)
+    """Полное обновление задачи, при переданном If-Match изменяется только не устаревшая версия."""
+    task = await crud.update_task_repo(session, update_task, *scope.conditions)
+    if task is None:
+        raise scope.not_found()
+    response.headers.update(validator_headers(task_etag(task), task_version(task)))
     return task
 
 
 @router.patch(
-    "/{task_id}",
+    "/{task_id:uuid}",
     response_model=ReadTask,
-    responses=DEFAULT_RESPONSES | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
+    responses=DEFAULT_RESPONSES
+    | PRECONDITION_FAILED_RESPONSES
+    | {status.HTTP_404_NOT_FOUND: {"description": "Пользователь или задача не найдены."}},
 )
 async def update_task_status(
     task_status: TaskStatusID,
-    task: Annotated[Task, Depends(get_task_by_id_for_current_user)],
+    scope: Annotated[TaskWriteScope, Depends(get_task_write_scope)],
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    response: Response,
 ) -> Task:
-    """Обновление статуса задачи."""
-    task = await crud.update_task_status_repo(session, task, task_status)
+    """Обновление статуса задачи, при переданном If-Match изменяется только не устаревшая версия."""
+    task = await crud.update_task_status_repo(session, task_status, *scope.conditions)
+    if task is None:
+        raise scope.not_found()
+    response.headers.update(validator_headers(task_etag(task), task_version(task)))
     return task
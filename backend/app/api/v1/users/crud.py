@@ -1,24 +1,34 @@
 from uuid import UUID
 
-from sqlalchemy import Result, or_, select
+from sqlalchemy import ColumnElement, Result, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from app.api.v1.users.schemas import CreateUser, PartialUpdateUser, UpdateUser
+from app.constants import UNIQUE_VIOLATION
 from app.db.models import User
+from app.security.passwords import password_hasher_pool
 
 
-async def create_user_repo(session: AsyncSession, new_user_data: CreateUser) -> User:
-    """Создание нового пользователя."""
-    user = User(
-        email=new_user_data.email,
-        first_name=new_user_data.first_name,
-        second_name=new_user_data.second_name,
-        middle_name=new_user_data.middle_name,
-        username=new_user_data.username,
-    )
-    user.password = new_user_data.password
-    session.add(user)
+async def _user_values(user_data: dict) -> dict:
+    """Значения колонок пользователя, пароль заменяется его хешем."""
+    password = user_data.pop("password", None)
+    if password is not None:
+        user_data["_password_hash"] = await password_hasher_pool.hash(password)
+    return user_data
+
+
+async def create_user_repo(session: AsyncSession, new_user_data: CreateUser) -> User | None:
+    """Создание нового пользователя одним запросом INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+    Возвращает None, если пользователь с таким email или username уже зарегистрирован.
+    """
+    values = await _user_values(new_user_data.model_dump())
+    stmt = insert(User).values(**values).on_conflict_do_nothing().returning(User)
+    results: Result = await session.execute(stmt)
+    user = results.scalar()
     await session.commit()
     return user
 
@@ -58,6 +68,13 @@ async def get_user_by_id_repo(session: AsyncSession, user_id: UUID, *option: _Ab
     return results.scalar()
 
 
+async def user_exists_repo(session: AsyncSession, user_id: UUID) -> bool:
+    """Проверяет существование пользователя с заданным id."""
+    stmt = select(User.id).where(User.id == user_id)
+    results: Result = await session.execute(stmt)
+    return results.scalar() is not None
+
+
 async def delete_user_repo(session: AsyncSession, user: User) -> None:
     """Удаляет пользователя из базы."""
     await session.delete(user)
@@ -65,11 +82,25 @@ async def delete_user_repo(session: AsyncSession, user: User) -> None:
 
 
 async def update_user_repo(
-    session: AsyncSession, user: User, new_user_data: UpdateUser | PartialUpdateUser, partial: bool = False
-) -> User:
-    """Полное или частичное обновление информации о пользователи."""
-    user_data = new_user_data.model_dump(exclude_unset=partial)
-    for key, value in user_data.items():
-        setattr(user, key, value)
+    session: AsyncSession,
+    new_user_data: UpdateUser | PartialUpdateUser,
+    *conditions: ColumnElement[bool],
+    partial: bool = False,
+) -> User | None:
+    """Полное или частичное обновление информации о пользователи одним запросом UPDATE ... RETURNING.
+
+    Возвращает None, если email или username уже заняты другим пользователем.
+    Если под условия не попал ни один пользователь, выбрасывает NoResultFound.
+    """
+    values = await _user_values(new_user_data.model_dump(exclude_unset=partial))
+    stmt = update(User).where(*conditions).values(**values).returning(User).execution_options(populate_existing=True)
+    try:
+        results: Result = await session.execute(stmt)
+    except IntegrityError as error:
+        if getattr(error.orig, "sqlstate", None) != UNIQUE_VIOLATION:
+            raise
+        await session.rollback()
+        return None
+    user = results.scalar_one()
     await session.commit()
     return user
@@ -1,12 +1,28 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.auth.jwt import create_access_token, create_refresh_token, decode_token
-from app.api.v1.dependencies.jwt import user_id_from_refresh_token
-from app.api.v1.dependencies.users import auth_user, get_current_user
+from app.api.v1.auth.principal import principal_cache
+from app.api.v1.auth.revocation import revocation_filter, revoke_refresh_token
+from app.api.v1.dependencies.conditional import (
+    IfModifiedSince,
+    IfNoneMatch,
+    is_not_modified,
+    user_etag,
+    validator_headers,
+)
+from app.api.v1.dependencies.jwt import refresh_token_payload
+from app.api.v1.dependencies.users import (
+    UserWriteScope,
+    auth_user,
+    get_current_user,
+    get_current_user_for_read,
+    get_current_user_for_update,
+)
 from app.api.v1.users import crud
 from app.api.v1.users.schemas import (
     CreateUser,
@@ -17,7 +33,12 @@ from app.api.v1.users.schemas import (
     TokenValidationResult,
     UpdateUser,
 )
-from app.constants import DEFAULT_RESPONSES
+from app.constants import (
+    DEFAULT_RESPONSES,
+    NOT_MODIFIED_RESPONSES,
+    OVERLOADED_RESPONSES,
+    PRECONDITION_FAILED_RESPONSES,
+)
 from app.db import db_helper
 from app.db.models import User
 
@@ -27,7 +48,7 @@ router = APIRouter(tags=["Users"])
 @router.post(
     "/jwt/create/",
     status_code=status.HTTP_201_CREATED,
-    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Ошибка авторизации"}},
+    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Ошибка авторизации"}} | OVERLOADED_RESPONSES,
 )
 async def create_tokens(user: Annotated[User, Depends(auth_user)]) -> JWTTokensPairWithTokenType:
     """Логин пользователя для получения JWT токенов."""
@@ -41,23 +62,46 @@ async def create_tokens(user: Annotated[User, Depends(auth_user)]) -> JWTTokensP
     "/jwt/refresh/",
     responses={status.HTTP_401_UNAUTHORIZED: {"description": "Некорректный refresh токен"}},
 )
-async def tokens_refresh(user_id: Annotated[UUID, Depends(user_id_from_refresh_token)]) -> JWTTokensPairWithTokenType:
-    """Обновление токенов по refresh токену."""
+async def tokens_refresh(
+    payload: Annotated[dict, Depends(refresh_token_payload)],
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+) -> JWTTokensPairWithTokenType:
+    """Обновление токенов по refresh токену, использованный refresh токен отзывается."""
+    if not await revoke_refresh_token(session, payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен отозван")
+    user_id = UUID(payload["sub"])
     return JWTTokensPairWithTokenType(
         access_token=create_access_token(user_id),
         refresh_token=create_refresh_token(user_id),
     )
 
 
+@router.post(
+    "/jwt/revoke/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_description="Refresh токен отозван",
+    responses={status.HTTP_401_UNAUTHORIZED: {"description": "Некорректный refresh токен"}},
+)
+async def token_revoke(
+    payload: Annotated[dict, Depends(refresh_token_payload)],
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+) -> None:
+    """Отзывает refresh токен."""
+    await revoke_refresh_token(session, payload)
+
+
 @router.post("/jwt/validate/")
 async def token_validate(token: JWTTokenForValidation) -> TokenValidationResult:
     """Валидирует токен."""
     try:
-        decode_token(token.token)
+        payload = decode_token(token.token)
     except HTTPException:
         return TokenValidationResult(validation_result=False)
-    else:
-        return TokenValidationResult(validation_result=True)
+    if payload.get("token_type") == "refresh" and (
+        "jti" not in payload or revocation_filter.is_revoked(UUID(payload["jti"]))
+    ):
+        return TokenValidationResult(validation_result=False)
+    return TokenValidationResult(validation_result=True)
 
 
 @router.post(
@@ -65,29 +109,43 @@ async def token_validate(token: JWTTokenForValidation) -> TokenValidationResult:
     response_model=ReadUser,
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Пользователь с таким username или email уже зарегистрирован"},
-    },
+    }
+    | OVERLOADED_RESPONSES,
 )
 async def user_register(
     new_user_data: CreateUser, session: Annotated[AsyncSession, Depends(db_helper.get_session)]
 ) -> User:
     """Создание нового пользователя."""
-    user_from_bd = await crud.get_user_by_email_or_username_repo(session, new_user_data.email, new_user_data.username)
-    if user_from_bd is not None:
+    user = await crud.create_user_repo(session=session, new_user_data=new_user_data)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким email или username ужк зарегистрирован",
         )
-    user = await crud.create_user_repo(session=session, new_user_data=new_user_data)
+    db_helper.remember_write(user.id)
     return user
 
 
 @router.get(
     "/me/",
     response_model=ReadUser,
-    responses=DEFAULT_RESPONSES,
+    responses=DEFAULT_RESPONSES | NOT_MODIFIED_RESPONSES,
 )
-async def get_user_me(user: Annotated[User, Depends(get_current_user)]) -> User:
-    """Получает информацию о текущем пользователе."""
+async def get_user_me(
+    user: Annotated[User, Depends(get_current_user_for_read)],
+    response: Response,
+    if_none_match: IfNoneMatch = None,
+    if_modified_since: IfModifiedSince = None,
+) -> User | Response:
+    """Получает информацию о текущем пользователе.
+
+    Ответ содержит ETag и Last-Modified, при совпадении If-None-Match или If-Modified-Since возвращается 304 без тела.
+    """
+    etag = user_etag(user)
+    headers = validator_headers(etag, user.updated_at)
+    if is_not_modified(etag, if_none_match, user.updated_at, if_modified_since):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
     return user
 
 
@@ -103,6 +161,7 @@ async def delete_user_me(
 ) -> None:
     """Удаляет текущего пользователя."""
     await crud.delete_user_repo(session, user)
+    principal_cache.pop(user.id)
 
 
 @router.put(
@@ -111,26 +170,27 @@ async def delete_user_me(
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Такой email или username уже есть в базе"},
     }
-    | DEFAULT_RESPONSES,
+    | DEFAULT_RESPONSES
+    | PRECONDITION_FAILED_RESPONSES
+    | OVERLOADED_RESPONSES,
 )
 async def update_user_me(
     new_user_data: UpdateUser,
-    user: Annotated[User, Depends(get_current_user)],
+    scope: Annotated[UserWriteScope, Depends(get_current_user_for_update)],
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    response: Response,
 ) -> User:
-    """Полное обновление информации о пользователе."""
-    user_from_bd = await crud.get_user_by_email_or_username_repo(
-        session,
-        new_user_data.email,
-        new_user_data.username,
-        exclude_user_id=user.id,
-    )
-    if user_from_bd is not None:
+    """Полное обновление информации о пользователе, при If-Match изменяется только не устаревшая версия."""
+    try:
+        user = await crud.update_user_repo(session, new_user_data, *scope.conditions)
+    except NoResultFound:
+        raise scope.not_found()
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким email или username ужк зарегистрирован",
         )
-    user = await crud.update_user_repo(session, user, new_user_data)
+    response.headers.update(validator_headers(user_etag(user), user.updated_at))
     return user
 
 
@@ -140,24 +200,25 @@ async def update_user_me(
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Такой email или username уже есть в базе"},
     }
-    | DEFAULT_RESPONSES,
+    | DEFAULT_RESPONSES
+    | PRECONDITION_FAILED_RESPONSES
+    | OVERLOADED_RESPONSES,
 )
 async def partial_update_user_me(
     new_user_data: PartialUpdateUser,
-    user: Annotated[User, Depends(get_current_user)],
+    scope: Annotated[UserWriteScope, Depends(get_current_user_for_update)],
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    response: Response,
 ) -> User:
-    """Частичное обновление информации о пользователе."""
-    user_from_bd = await crud.get_user_by_email_or_username_repo(
-        session,
-        new_user_data.email,
-        new_user_data.username,
-        exclude_user_id=user.id,
-    )
-    if user_from_bd is not None:
+    """Частичное обновление информации о пользователе, при If-Match изменяется только не устаревшая версия."""
+    try:
+        user = await crud.update_user_repo(session, new_user_data, *scope.conditions, partial=True)
+    except NoResultFound:
+        raise scope.not_found()
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким email или username ужк зарегистрирован",
         )
-    user = await crud.update_user_repo(session, user, new_user_data, partial=True)
+    response.headers.update(validator_headers(user_etag(user), user.updated_at))
     return user
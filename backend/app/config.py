@@ -1,5 +1,6 @@
 from datetime import timedelta
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -13,6 +14,7 @@ class ApiV1Endpoints(BaseModel):
     users: str = "/users"
     tasks: str = "/tasks"
     classifiers: str = "/classifiers"
+    metrics: str = "/metrics"
 
 
 class ApiV1(BaseModel):
@@ -27,6 +29,8 @@ class Api(BaseModel):
 
     prefix: str = "/api"
     v1: ApiV1 = ApiV1()
+    # Сериализовать ответы задач один раз сразу в байты, минуя повторную валидацию по response_model
+    fast_json: bool = False
 
 
 class DataBaseSettings(BaseModel):
@@ -40,6 +44,55 @@ class DataBaseSettings(BaseModel):
 
     echo: bool = False
 
+    # Размер пула соединений и количество соединений сверх него
+    pool_size: int = 5
+    max_overflow: int = 10
+    # Сколько секунд ждать свободное соединение прежде чем вернуть ошибку
+    pool_timeout: float = 30
+    # Через сколько секунд пересоздавать соединение, -1 - не пересоздавать
+    pool_recycle: int = -1
+    # Проверять соединение перед выдачей из пула
+    pool_pre_ping: bool = False
+    # Выдавать последнее возвращенное соединение, чтобы лишние соединения простаивали и закрывались по pool_recycle
+    pool_use_lifo: bool = False
+    # Размер кеша подготовленных запросов asyncpg и кеша SQLAlchemy поверх него, 0 - отключить (нужно для pgbouncer)
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    # Таймаут выполнения запроса и таймаут подключения в секундах
+    command_timeout: float | None = None
+    connect_timeout: float = 60
+
+    # Возвращать соединение в пул сразу после запросов на чтение, не дожидаясь конца обработки запроса.
+    # Каждое чтение без изменений фиксируется в своей транзакции, поэтому режим включается явно
+    eager_release: bool = False
+
+    # Реплики для чтения в виде host или host:port, учетные данные и база как у основного сервера
+    replica_hosts: list[str] = []
+    # Максимальное отставание реплики в секундах, при большем отставании чтение идет с основного сервера
+    replica_max_lag: float = 5.0
+    # Интервал проверки доступности и отставания реплик в секундах
+    replica_check_interval: float = 5.0
+    # Сколько секунд после записи пользователь читает с основного сервера, чтобы видеть свои изменения
+    read_your_writes_window: float = 10.0
+
+    @property
+    def engine_options(self) -> dict:
+        """Параметры пула соединений и драйвера для create_async_engine."""
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "pool_use_lifo": self.pool_use_lifo,
+            "connect_args": {
+                "statement_cache_size": self.statement_cache_size,
+                "prepared_statement_cache_size": self.prepared_statement_cache_size,
+                "command_timeout": self.command_timeout,
+                "timeout": self.connect_timeout,
+            },
+        }
+
     @property
     def database_uri(self):
         """Свойство для получение db uri."""
@@ -48,6 +101,18 @@ class DataBaseSettings(BaseModel):
             f"{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def replica_uris(self) -> list[str]:
+        """Список db uri реплик."""
+        uris = []
+        for replica_host in self.replica_hosts:
+            host, _, port = replica_host.partition(":")
+            uris.append(
+                f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@{host}:"
+                f"{port or self.postgres_port}/{self.postgres_db}"
+            )
+        return uris
+
 
 class JWTSettings(BaseModel):
     """Конфигурация настроек безопасности."""
@@ -55,11 +120,61 @@ class JWTSettings(BaseModel):
     # Пути к приват и паблик ключам
     private_key_path: Path = BASE_DIR / "certs" / "private_key"
     public_key_path: Path = BASE_DIR / "certs" / "public_key.pub"
+    # Алгоритм подписи для RSA ключей, для EC и Ed25519 ключей алгоритм (ES256, EdDSA) определяется по типу ключа
     algorithm: str = "RS256"
+    # Идентификатор (kid) ключа, которым подписываются новые токены
+    key_id: str = "main"
+    # Публичные ключи предыдущих поколений (kid -> путь), токены подписанные ими принимаются во время ротации
+    verification_keys: dict[str, Path] = {}
+    # Интервал проверки файлов ключей на изменения в секундах, 0 - не отслеживать изменения
+    keys_reload_interval: float = 5.0
+    # Максимальное количество проверенных токенов в кеше, 0 - кеш отключен
+    token_cache_size: int = 10000
+    # Максимальное время хранения проверенного токена в кеше
+    token_cache_ttl: timedelta = timedelta(hours=1)
+    # Интервал синхронизации отозванных refresh токенов с базой в секундах
+    revocation_sync_interval: float = 5.0
+    # Насколько раньше последней синхронизации перечитывать отозванные токены
+    revocation_sync_overlap: timedelta = timedelta(minutes=1)
     access_token_expires_delta: timedelta = timedelta(days=1)
     refresh_token_expires_delta: timedelta = timedelta(days=7)
 
 
+class PrincipalSettings(BaseModel):
+    """Настройки получения текущего пользователя для эндпоинтов задач."""
+
+    # Не загружать строку User на каждый запрос, а брать пользователя из токена и кеша проверенных пользователей.
+    # Удаление пользователя сбрасывает кеш только в текущем процессе, в остальных запись живет до cache_ttl.
+    enabled: bool = False
+    cache_size: int = 10000
+    cache_ttl: timedelta = timedelta(minutes=5)
+
+
+class ClassifierSettings(BaseModel):
+    """Настройки кеша классификаторов."""
+
+    # Интервал перечитывания классификаторов из базы в секундах, 0 - только при старте и явной инвалидации
+    reload_interval: float = 300.0
+
+
+class PasswordSettings(BaseModel):
+    """Настройки хеширования паролей."""
+
+    # Алгоритм для новых хешей, хеши другим алгоритмом пересчитываются при успешном входе пользователя.
+    # Для argon2id нужна дополнительная зависимость: poetry install --extras argon2
+    algorithm: Literal["bcrypt", "argon2id"] = "bcrypt"
+    # log2 количества раундов bcrypt
+    bcrypt_rounds: int = 12
+    # Параметры argon2id: количество итераций, память в KiB и количество потоков
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    # Количество потоков для хеширования и проверки паролей
+    workers: int = 4
+    # Максимальное количество ожидающих свободный поток задач, при превышении отвечаем 503
+    max_queue: int = 32
+
+
 class Settings(BaseSettings):
     """Конфигурация бекенда."""
 
@@ -77,6 +192,15 @@ class Settings(BaseSettings):
     # Настройки безопасности
     jwt: JWTSettings = JWTSettings()
 
+    # Настройки получения текущего пользователя
+    principal: PrincipalSettings = PrincipalSettings()
+
+    # Настройки хеширования паролей
+    passwords: PasswordSettings = PasswordSettings()
+
+    # Настройки кеша классификаторов
+    classifiers: ClassifierSettings = ClassifierSettings()
+
     model_config = SettingsConfigDict(case_sensitive=False, env_prefix="API_", env_nested_delimiter="__")
 
 
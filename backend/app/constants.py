@@ -11,12 +11,32 @@ USERNAME_REGEX = re.compile(r"^[a-zA-Z0-9_.+-]+$")
 
 # Максимально возможное количество задач для запроса на получение списка задач
 MAX_AMOUNT_OF_TASKS_TO_DISPLAY = 1000
+# Максимальное количество задач в одном пакетном запросе
+MAX_TASKS_IN_BATCH = 1000
+# Максимальная длина строки файла импорта задач в символах
+MAX_TASK_IMPORT_LINE_LENGTH = 1024 * 1024
+# Количество отклоненных строк импорта, попадающих в отчет
+MAX_TASK_IMPORT_ERRORS_IN_REPORT = 100
+# Количество задач, читаемых из курсора за раз при экспорте
+TASK_EXPORT_BATCH_SIZE = 1000
+# Размер части ответа при экспорте задач в байтах
+TASK_EXPORT_CHUNK_SIZE = 64 * 1024
 
 # Идентификатор статуса задачи "Не выполнено"
 NOT_COMPLETED_TASK_STATUS_ID = 1
 # Идентификатор статуса задачи "Выполнено"
 COMPLETED_TASK_STATUS_ID = 2
 
+# Конфигурация полнотекстового поиска по задачам
+TASK_SEARCH_CONFIG = "russian"
+# Параметры подсветки найденных слов в результатах поиска, подсветка строится по экранированному HTML тексту
+TASK_SEARCH_HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxFragments=2, MaxWords=20, MinWords=5"
+# Замены для экранирования текста задач перед подсветкой, & заменяется первым
+HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+# Код ошибки PostgreSQL при нарушении уникальности
+UNIQUE_VIOLATION = "23505"
+
 # Корневая директория проекта.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,3 +46,16 @@ DEFAULT_RESPONSES = {
     status.HTTP_403_FORBIDDEN: {"description": "Вы не авторизовались"},
     status.HTTP_404_NOT_FOUND: {"description": "Пользователь не найден в базе данных"},
 }
+
+# Ответы на условные запросы.
+NOT_MODIFIED_RESPONSES = {
+    status.HTTP_304_NOT_MODIFIED: {"description": "Ресурс не изменился"},
+}
+PRECONDITION_FAILED_RESPONSES = {
+    status.HTTP_412_PRECONDITION_FAILED: {"description": "Ресурс был изменен после получения клиентом"},
+}
+
+# Ответ при переполнении очереди хеширования паролей.
+OVERLOADED_RESPONSES = {
+    status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Сервис перегружен, повторите попытку позже"},
+}
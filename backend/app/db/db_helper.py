@@ -1,32 +1,350 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections.abc import AsyncGenerator, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from uuid import UUID
 
+from sqlalchemy import event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Пользователь текущего запроса, по нему реплики выбираются с учетом его недавних записей
+current_user_id: ContextVar[UUID | None] = ContextVar("current_user_id", default=None)
+
+# Отставание реплики в секундах, 0 если реплика воспроизвела все полученные изменения
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass
+class PoolWaitStats:
+    """Накопленная статистика получения соединений из пула, время включает установку новых соединений."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Снимок состояния пула соединений."""
+
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    total_wait_time: float
+    max_wait_time: float
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, считающий время ожидания свободного соединения и таймауты."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Инициализирует пул и статистику ожидания."""
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        """Выдает соединение из пула, замеряя время ожидания."""
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.wait_stats.checkouts += 1
+            self.wait_stats.total_wait_time += elapsed
+            self.wait_stats.max_wait_time = max(self.wait_stats.max_wait_time, elapsed)
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        """Пересоздает пул, сохраняя накопленную статистику."""
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+@dataclass
+class Replica:
+    """Реплика базы данных и ее состояние."""
+
+    name: str
+    engine: AsyncEngine
+    healthy: bool = True
+    lag: float = 0.0
+
+
+class PrimarySession(Session):
+    """Сессия основного сервера, запоминающая пользователей с недавними записями."""
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_flush_write(session: Session, flush_context) -> None:
+    """Отмечает транзакцию с изменениями через unit of work."""
+    session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _mark_statement_write(orm_execute_state: ORMExecuteState) -> None:
+    """Отмечает транзакцию с изменениями через insert, update или delete."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _remember_write(session: Session) -> None:
+    """Запоминает пользователя, зафиксировавшего изменения."""
+    user_id = current_user_id.get()
+    if session.info.pop("has_writes", False) and user_id is not None:
+        session.info["remember_write"](user_id)
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _forget_write(session: Session) -> None:
+    """Сбрасывает отметку об изменениях при откате."""
+    session.info.pop("has_writes", None)
+
+
+class ReadSession(Session):
+    """Сессия только для чтения, выбирающая сервер при первом запросе и не меняющая его до закрытия."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """Возвращает engine реплики или основного сервера."""
+        if "engine" not in self.info:
+            self.info["engine"] = self.info["select_read_engine"]()
+        return self.info["engine"].sync_engine
+
+
+class EagerReleaseSession(AsyncSession):
+    """Асинхронная сессия, которая держит соединение только на время запросов.
+
+    Соединение берется из пула при первом запросе, как и в обычной сессии, но если в транзакции нет изменений,
+    она фиксируется сразу после запроса на чтение и соединение возвращается в пул. Результаты запросов
+    AsyncSession буферизуются целиком, а объекты после commit не истекают, поэтому ими можно пользоваться дальше.
+    Сессия с изменениями ведет себя как обычная и освобождает соединение на commit или rollback.
+    Каждый запрос на чтение выполняется в своей транзакции, что не отличается от READ COMMITTED.
+    """
+
+    async def _release_if_idle(self) -> None:
+        """Завершает транзакцию без изменений, возвращая соединение в пул."""
+        if not self.in_transaction() or self.in_nested_transaction():
+            return
+        if self.info.get("has_writes") or self.new or self.dirty or self.deleted:
+            return
+        await self.commit()
+
+    async def execute(self, *args, **kwargs):
+        """Выполняет запрос и освобождает соединение если транзакция только читала."""
+        result = await super().execute(*args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def scalar(self, *args, **kwargs):
+        """Выполняет запрос, возвращает скаляр и освобождает соединение если транзакция только читала."""
+        result = await super().scalar(*args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def scalars(self, *args, **kwargs):
+        """Выполняет запрос, возвращает скаляры и освобождает соединение если транзакция только читала."""
+        result = await super().scalars(*args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def get(self, *args, **kwargs):
+        """Получает объект по ключу и освобождает соединение если транзакция только читала."""
+        result = await super().get(*args, **kwargs)
+        await self._release_if_idle()
+        return result
+
+    async def refresh(self, *args, **kwargs) -> None:
+        """Перечитывает объект и освобождает соединение если транзакция только читала."""
+        await super().refresh(*args, **kwargs)
+        await self._release_if_idle()
+
 
 class DataBaseHelper:
-    """Менеджер сессии к базе данных."""
+    """Менеджер сессии к базе данных.
+
+    Управляет основным сервером и репликами для чтения. Сессии для чтения направляются на исправную реплику
+    с допустимым отставанием, а если таких нет или пользователь недавно сам что-то записал - на основной сервер.
+    """
 
     def __init__(
         self,
         db_uri,
         echo: bool = False,
+        replica_uris: Sequence[str] = (),
+        replica_max_lag: float = 5.0,
+        replica_check_interval: float = 5.0,
+        read_your_writes_window: float = 10.0,
+        eager_release: bool = False,
+        **engine_options,
     ) -> None:
-        """Инициализирует асинхронный engine и создает фабрику сессий."""
-        self.engine: AsyncEngine = create_async_engine(url=db_uri, echo=echo)
+        """Инициализирует асинхронные engine основного сервера и реплик и создает фабрики сессий.
+
+        При eager_release сессии возвращают соединение в пул сразу после запросов на чтение.
+        """
+        self.engine: AsyncEngine = create_async_engine(
+            url=db_uri,
+            echo=echo,
+            poolclass=InstrumentedAsyncQueuePool,
+            **engine_options,
+        )
+        self.replicas: list[Replica] = []
+        for replica_uri in replica_uris:
+            replica_engine = create_async_engine(
+                url=replica_uri,
+                echo=echo,
+                poolclass=InstrumentedAsyncQueuePool,
+                **engine_options,
+            )
+            replica = Replica(name=f"{replica_engine.url.host}:{replica_engine.url.port}", engine=replica_engine)
+            event.listen(replica_engine.sync_engine, "handle_error", self._make_error_handler(replica))
+            self.replicas.append(replica)
+        self.replica_max_lag = replica_max_lag
+        self.replica_check_interval = replica_check_interval
+        self.read_your_writes_window = read_your_writes_window
+        self._recent_writes: dict[UUID, float] = {}
+        self._monitor: asyncio.Task | None = None
+        session_class = EagerReleaseSession if eager_release else AsyncSession
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind=self.engine, expire_on_commit=False, autocommit=False, autoflush=False
+            bind=self.engine,
+            class_=session_class,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+            sync_session_class=PrimarySession,
+            info={"remember_write": self.remember_write},
         )
+        self.read_session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
+            class_=session_class,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+            sync_session_class=ReadSession,
+            info={"select_read_engine": self.select_read_engine},
+        )
+
+    @staticmethod
+    def _make_error_handler(replica: Replica):
+        """Создает обработчик ошибок, исключающий реплику из выбора при потере соединения."""
+
+        def handle_error(context: ExceptionContext) -> None:
+            if context.is_disconnect:
+                replica.healthy = False
+
+        return handle_error
+
+    def remember_write(self, user_id: UUID) -> None:
+        """Запоминает что пользователь записал данные, его чтения временно идут на основной сервер."""
+        now = time.monotonic()
+        if len(self._recent_writes) > 10000:
+            self._recent_writes = {key: until for key, until in self._recent_writes.items() if until > now}
+        self._recent_writes[user_id] = now + self.read_your_writes_window
+
+    def select_read_engine(self) -> AsyncEngine:
+        """Выбирает engine для чтения."""
+        user_id = current_user_id.get()
+        if user_id is not None and self._recent_writes.get(user_id, 0) > time.monotonic():
+            return self.engine
+        candidates = [replica for replica in self.replicas if replica.healthy and replica.lag <= self.replica_max_lag]
+        if not candidates:
+            return self.engine
+        return random.choice(candidates).engine
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         """Получение асинхронной сессии."""
         async with self.session_factory() as session:
             yield session
 
+    async def get_read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """Получение асинхронной сессии только для чтения, по возможности с реплики."""
+        async with self.read_session_factory() as session:
+            yield session
+
+    def get_read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Фабрика сессий только для чтения для ответов, читающих из базы после завершения обработчика."""
+        return self.read_session_factory
+
+    async def check_replicas(self) -> None:
+        """Проверяет доступность и отставание реплик."""
+        for replica in self.replicas:
+            try:
+                async with asyncio.timeout(self.replica_check_interval or 5.0):
+                    async with replica.engine.connect() as connection:
+                        replica.lag = float((await connection.execute(REPLICA_LAG_QUERY)).scalar())
+            except (SQLAlchemyError, OSError, TimeoutError):
+                if replica.healthy:
+                    logger.warning("Реплика %s недоступна, чтение переключено на другие серверы", replica.name)
+                replica.healthy = False
+            else:
+                replica.healthy = True
+
+    async def _watch_replicas(self) -> None:
+        """Периодически проверяет реплики."""
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.replica_check_interval)
+
+    async def start(self) -> None:
+        """Запускает проверку реплик."""
+        if self.replicas and self.replica_check_interval > 0 and self._monitor is None:
+            self._monitor = asyncio.create_task(self._watch_replicas())
+
+    def pool_stats(self) -> PoolStats:
+        """Текущее состояние пула соединений."""
+        pool: InstrumentedAsyncQueuePool = self.engine.pool
+        return PoolStats(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+            checkouts=pool.wait_stats.checkouts,
+            timeouts=pool.wait_stats.timeouts,
+            total_wait_time=pool.wait_stats.total_wait_time,
+            max_wait_time=pool.wait_stats.max_wait_time,
+        )
+
     async def dispose(self) -> None:
         """Утилизация Engine при завершении работы приложения."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._monitor
+            self._monitor = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
         await self.engine.dispose()
 
 
-db_helper = DataBaseHelper(settings.db.database_uri, echo=settings.db.echo)
+db_helper = DataBaseHelper(
+    settings.db.database_uri,
+    echo=settings.db.echo,
+    replica_uris=settings.db.replica_uris,
+    replica_max_lag=settings.db.replica_max_lag,
+    replica_check_interval=settings.db.replica_check_interval,
+    read_your_writes_window=settings.db.read_your_writes_window,
+    eager_release=settings.db.eager_release,
+    **settings.db.engine_options,
+)
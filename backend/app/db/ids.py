@@ -0,0 +1,41 @@
+import os
+import threading
+import time
+from uuid import UUID
+
+# Имя SQL функции, генерирующей UUIDv7 на стороне базы
+UUID7_SQL_FUNCTION = "uuid_generate_v7"
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_last_counter = 0
+
+
+def uuid7() -> UUID:
+    """Генерирует UUIDv7 по RFC 9562: 48 бит времени в миллисекундах, затем случайные биты.
+
+    Ключи, созданные позже, больше созданных раньше, поэтому новые строки попадают в конец индекса первичного ключа.
+    Внутри одной миллисекунды 12 бит rand_a работают как счетчик со случайным началом, так что ключи одного
+    процесса строго возрастают. При переполнении счетчика время сдвигается на следующую миллисекунду.
+    """
+    global _last_timestamp, _last_counter
+    random_bytes = os.urandom(10)
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            counter = int.from_bytes(random_bytes[:2]) & 0x7FF
+        else:
+            timestamp = _last_timestamp
+            counter = _last_counter + 1
+            if counter > 0xFFF:
+                timestamp += 1
+                counter = 0
+        _last_timestamp, _last_counter = timestamp, counter
+    rand_b = int.from_bytes(random_bytes[2:]) & 0x3FFF_FFFF_FFFF_FFFF
+    value = (timestamp & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return UUID(int=value)
+
+
+def uuid7_timestamp(value: UUID) -> float:
+    """Время создания UUIDv7 в секундах unix."""
+    return (value.int >> 80) / 1000
@@ -1,6 +1,17 @@
 from .base import Base
 from .classifiers import TaskStatus
+from .counters import TaskCompletionCounter, TaskCounter, TaskDeadlineCounter
 from .tasks import Task
+from .tokens import RevokedToken
 from .users import User
 
-__all__ = ["Base", "Task", "User", "TaskStatus"]
+__all__ = [
+    "Base",
+    "Task",
+    "User",
+    "TaskStatus",
+    "RevokedToken",
+    "TaskCounter",
+    "TaskDeadlineCounter",
+    "TaskCompletionCounter",
+]
@@ -0,0 +1,50 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.models.base import Base
+
+
+class TaskCounter(Base):
+    """Количество задач пользователя в статусе, поддерживается триггерами таблицы задач."""
+
+    __tablename__ = "task_counters"
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Идентификатор пользователя",
+    )
+    task_status_id: Mapped[int] = mapped_column(
+        ForeignKey("cl_task_status.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Идентификатор статуса",
+    )
+    count: Mapped[int] = mapped_column(server_default="0", comment="Количество задач")
+
+
+class TaskDeadlineCounter(Base):
+    """Количество невыполненных задач пользователя со сроком выполнения в день по UTC, поддерживается триггерами."""
+
+    __tablename__ = "task_deadline_counters"
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Идентификатор пользователя",
+    )
+    day: Mapped[date] = mapped_column(primary_key=True, comment="День срока выполнения по UTC")
+    count: Mapped[int] = mapped_column(server_default="0", comment="Количество задач")
+
+
+class TaskCompletionCounter(Base):
+    """Количество задач пользователя, выполненных в день по UTC, поддерживается триггерами таблицы задач."""
+
+    __tablename__ = "task_completion_counters"
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Идентификатор пользователя",
+    )
+    day: Mapped[date] = mapped_column(primary_key=True, comment="День выполнения по UTC")
+    count: Mapped[int] = mapped_column(server_default="0", comment="Количество задач")
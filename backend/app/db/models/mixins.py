@@ -1,16 +1,21 @@
-from uuid import UUID, uuid4
+from uuid import UUID
 
 from sqlalchemy import text
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.db.ids import UUID7_SQL_FUNCTION, uuid7
+
 
 class UUIDPrimaryKey:
-    """UUID первичный ключ для моделей алхимии."""
+    """UUID первичный ключ для моделей алхимии.
+
+    Новые ключи - упорядоченные по времени UUIDv7, ранее созданные UUIDv4 остаются действительными.
+    """
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
-        server_default=text("gen_random_uuid()"),
-        default=uuid4,
+        server_default=text(f"{UUID7_SQL_FUNCTION}()"),
+        default=uuid7,
         comment="Идентификатор",
     )
 
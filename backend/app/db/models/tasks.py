@@ -3,10 +3,12 @@ from functools import partial
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, func
+from sqlalchemy import Computed, ForeignKey, Index, String, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.sql.sqltypes import DATETIME_TIMEZONE
 
+from app.constants import TASK_SEARCH_CONFIG
 from app.db.models.base import Base
 from app.db.models.mixins import UUIDPrimaryKey
 
@@ -28,7 +30,6 @@ class Task(UUIDPrimaryKey, Base):
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
         comment="Идентификатор пользователя",
-        index=True,
     )
     created_at: Mapped[datetime] = mapped_column(DATETIME_TIMEZONE, server_default=func.now(), comment="Создана")
     updated_at: Mapped[datetime | None] = mapped_column(
@@ -39,6 +40,16 @@ class Task(UUIDPrimaryKey, Base):
     )
     complete_before: Mapped[datetime | None] = mapped_column(DATETIME_TIMEZONE, comment="Выполнить до")
     completed_at: Mapped[datetime | None] = mapped_column(DATETIME_TIMEZONE, comment="Выполнена")
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', title), 'A') || "
+            f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', description), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+        comment="Вектор полнотекстового поиска по заголовку и описанию",
+    )
 
     user: Mapped["User"] = relationship(back_populates="tasks")
     task_status: Mapped["TaskStatus"] = relationship(back_populates="tasks")
@@ -51,3 +62,19 @@ class Task(UUIDPrimaryKey, Base):
         if len(title) < 5:
             raise ValueError("Длинна заголовка задачи не может быть меньше 5 символов")
         return title
+
+
+# Индексы для постраничного вывода задач пользователя по курсору, по одному на каждое поле сортировки
+Index("ix_tasks_user_id_title_id", Task.user_id, Task.title, Task.id)
+Index("ix_tasks_user_id_created_at_id", Task.user_id, Task.created_at, Task.id)
+Index("ix_tasks_user_id_updated_at_id", Task.user_id, Task.updated_at, Task.id)
+Index("ix_tasks_user_id_complete_before_id", Task.user_id, Task.complete_before, Task.id)
+Index("ix_tasks_user_id_completed_at_id", Task.user_id, Task.completed_at, Task.id)
+
+# Индекс для фильтра задач пользователя по статусу
+Index("ix_tasks_user_id_task_status_id", Task.user_id, Task.task_status_id)
+
+# Индекс pg_trgm для поиска подстроки в заголовке через ILIKE
+Index("ix_tasks_title_trgm", Task.title, postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"})
+# Индекс полнотекстового поиска
+Index("ix_tasks_search_vector", Task.search_vector, postgresql_using="gin")
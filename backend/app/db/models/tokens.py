@@ -0,0 +1,23 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import DATETIME_TIMEZONE
+
+from app.db.models.base import Base
+
+
+class RevokedToken(Base):
+    """Модель отозванного refresh токена."""
+
+    __tablename__ = "revoked_tokens"
+    jti: Mapped[UUID] = mapped_column(primary_key=True, comment="Идентификатор токена")
+    user_id: Mapped[UUID] = mapped_column(comment="Идентификатор пользователя")
+    expires_at: Mapped[datetime] = mapped_column(DATETIME_TIMEZONE, comment="Истекает", index=True)
+    revoked_at: Mapped[datetime] = mapped_column(
+        DATETIME_TIMEZONE,
+        server_default=func.now(),
+        comment="Отозван",
+        index=True,
+    )
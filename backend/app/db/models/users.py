@@ -1,13 +1,21 @@
+from datetime import datetime, timezone
+from functools import partial
 from typing import TYPE_CHECKING
 
-import bcrypt
-from sqlalchemy import String
+from sqlalchemy import String, func
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy.sql.sqltypes import DATETIME_TIMEZONE
 
 from app.constants import EMAIL_REGEX
 from app.db.models.base import Base
 from app.db.models.mixins import UUIDPrimaryKey
+from app.security.passwords import (
+    check_password,
+    generate_password_hash,
+    password_hasher_pool,
+    password_needs_rehash,
+)
 
 if TYPE_CHECKING:
     from app.db.models import Task
@@ -23,6 +31,12 @@ class User(UUIDPrimaryKey, Base):
     middle_name: Mapped[str | None] = mapped_column(String(100), comment="Отчество")
     username: Mapped[str] = mapped_column(String(100), index=True, comment="Имя пользователя", unique=True)
     _password_hash: Mapped[str] = mapped_column(comment="Хеш пароля")
+    updated_at: Mapped[datetime] = mapped_column(
+        DATETIME_TIMEZONE,
+        server_default=func.now(),
+        comment="Обновлен",
+        onupdate=partial(datetime.now, tz=timezone.utc),
+    )
 
     tasks: Mapped[list["Task"]] = relationship(back_populates="user")
 
@@ -46,9 +60,21 @@ class User(UUIDPrimaryKey, Base):
         self._password_hash = self._generate_password_hash(plain_password)
 
     def _generate_password_hash(self, plain_password: str) -> str:
-        """Генерация хеша пароля с использованием bcrypt."""
-        return bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        """Генерация хеша пароля настроенным алгоритмом."""
+        return generate_password_hash(plain_password)
 
     def verify_password(self, plain_password: str) -> bool:
         """Проверка пароля через сравнение хеша."""
-        return bcrypt.checkpw(plain_password.encode("utf-8"), self._password_hash.encode("utf-8"))
+        return check_password(plain_password, self._password_hash)
+
+    def password_needs_rehash(self) -> bool:
+        """Проверяет создан ли хеш пароля с параметрами, отличными от текущих настроек."""
+        return password_needs_rehash(self._password_hash)
+
+    async def set_password(self, plain_password: str) -> None:
+        """Устанавливает пароль, хеш вычисляется в пуле потоков не блокируя цикл событий."""
+        self._password_hash = await password_hasher_pool.hash(plain_password)
+
+    async def check_password(self, plain_password: str) -> bool:
+        """Проверка пароля в пуле потоков не блокируя цикл событий."""
+        return await password_hasher_pool.verify(plain_password, self._password_hash)
@@ -0,0 +1,23 @@
+import json
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def explain(session: AsyncSession, stmt: Select, *options: str) -> dict:
+    """Возвращает план выполнения запроса в виде словаря EXPLAIN (FORMAT JSON)."""
+    connection = await session.connection()
+    compiled = stmt.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    explain_options = ", ".join(("FORMAT JSON", *options))
+    results = await connection.exec_driver_sql(f"EXPLAIN ({explain_options}) {compiled}", params)
+    plan = results.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def estimate_count(session: AsyncSession, stmt: Select) -> int:
+    """Оценка количества строк запроса по статистике планировщика, без выполнения самого запроса."""
+    plan = await explain(session, stmt)
+    return int(plan["Plan Rows"])
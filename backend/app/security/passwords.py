@@ -0,0 +1,265 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.config import PasswordSettings, settings
+
+T = TypeVar("T")
+
+
+class PasswordHasher(ABC):
+    """Базовый класс алгоритма хеширования паролей."""
+
+    # Префиксы хешей, которые умеет проверять алгоритм
+    prefixes: tuple[str, ...] = ()
+
+    def identify(self, password_hash: str) -> bool:
+        """Проверяет что хеш создан этим алгоритмом."""
+        return password_hash.startswith(self.prefixes)
+
+    @abstractmethod
+    def hash(self, plain_password: str) -> str:
+        """Вычисляет хеш пароля."""
+
+    @abstractmethod
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        """Проверяет пароль по хешу."""
+
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Проверяет отличаются ли параметры хеша от текущих настроек."""
+
+
+class BcryptHasher(PasswordHasher):
+    """Хеширование паролей через bcrypt."""
+
+    prefixes = ("$2a$", "$2b$", "$2y$")
+
+    def __init__(self, rounds: int = 12) -> None:
+        """Инициализирует алгоритм с заданной стоимостью (log2 количества раундов)."""
+        self.rounds = rounds
+
+    def hash(self, plain_password: str) -> str:
+        """Вычисляет хеш пароля."""
+        return bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt(self.rounds)).decode("utf-8")
+
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        """Проверяет пароль по хешу."""
+        return bcrypt.checkpw(plain_password.encode("utf-8"), password_hash.encode("utf-8"))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Проверяет отличается ли стоимость хеша от настроенной."""
+        return int(password_hash.split("$")[2]) != self.rounds
+
+
+class Argon2Hasher(PasswordHasher):
+    """Хеширование паролей через argon2id, требует дополнительной зависимости argon2."""
+
+    prefixes = ("$argon2id$",)
+
+    def __init__(self, time_cost: int = 3, memory_cost: int = 65536, parallelism: int = 4) -> None:
+        """Инициализирует алгоритм с заданными параметрами, memory_cost задается в KiB."""
+        try:
+            import argon2
+        except ImportError as e:
+            raise RuntimeError("Для argon2id установите зависимость: poetry install --extras argon2") from e
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self._exceptions = argon2.exceptions
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=argon2.Type.ID,
+        )
+
+    def hash(self, plain_password: str) -> str:
+        """Вычисляет хеш пароля."""
+        return self._hasher.hash(plain_password)
+
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        """Проверяет пароль по хешу."""
+        try:
+            return self._hasher.verify(password_hash, plain_password)
+        except (self._exceptions.VerificationError, self._exceptions.InvalidHashError):
+            return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Проверяет отличаются ли параметры хеша от настроенных."""
+        return self._hasher.check_needs_rehash(password_hash)
+
+
+class PasswordHashers:
+    """Набор алгоритмов хеширования.
+
+    Новые хеши создаются алгоритмом по умолчанию, существующие проверяются тем алгоритмом, которым были созданы.
+    """
+
+    def __init__(self, default: PasswordHasher, *legacy: PasswordHasher) -> None:
+        """Инициализирует набор алгоритмов."""
+        self.default = default
+        self.hashers = (default, *legacy)
+
+    def hash(self, plain_password: str) -> str:
+        """Вычисляет хеш пароля алгоритмом по умолчанию."""
+        return self.default.hash(plain_password)
+
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        """Проверяет пароль алгоритмом, которым был создан хеш."""
+        for hasher in self.hashers:
+            if hasher.identify(password_hash):
+                return hasher.verify(plain_password, password_hash)
+        return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Проверяет нужно ли пересчитать хеш с текущими настройками."""
+        return not self.default.identify(password_hash) or self.default.needs_rehash(password_hash)
+
+
+def build_password_hashers(password_settings: PasswordSettings) -> PasswordHashers:
+    """Создает набор алгоритмов хеширования по настройкам."""
+    bcrypt_hasher = BcryptHasher(rounds=password_settings.bcrypt_rounds)
+    if password_settings.algorithm == "argon2id":
+        argon2_hasher = Argon2Hasher(
+            time_cost=password_settings.argon2_time_cost,
+            memory_cost=password_settings.argon2_memory_cost,
+            parallelism=password_settings.argon2_parallelism,
+        )
+        return PasswordHashers(argon2_hasher, bcrypt_hasher)
+    try:
+        return PasswordHashers(bcrypt_hasher, Argon2Hasher())
+    except RuntimeError:
+        return PasswordHashers(bcrypt_hasher)
+
+
+def _measure(hasher: PasswordHasher, samples: int = 3) -> float:
+    """Среднее время хеширования пароля в секундах."""
+    started = time.perf_counter()
+    for _ in range(samples):
+        hasher.hash("calibration-password")
+    return (time.perf_counter() - started) / samples
+
+
+def calibrate_bcrypt(target: float, samples: int = 3) -> tuple[int, float]:
+    """Подбирает количество раундов bcrypt, время хеширования которых ближе всего к target секунд."""
+    best_rounds, best_time = 4, _measure(BcryptHasher(4), samples)
+    for rounds in range(5, 32):
+        elapsed = _measure(BcryptHasher(rounds), samples)
+        if abs(elapsed - target) < abs(best_time - target):
+            best_rounds, best_time = rounds, elapsed
+        if elapsed >= target:
+            break
+    return best_rounds, best_time
+
+
+def calibrate_argon2(target: float, memory_cost: int, parallelism: int, samples: int = 3) -> tuple[int, float]:
+    """Подбирает time_cost argon2id при заданных памяти и параллелизме, время которого ближе всего к target."""
+    best_time_cost, best_time = 1, _measure(Argon2Hasher(1, memory_cost, parallelism), samples)
+    for time_cost in range(2, 100):
+        elapsed = _measure(Argon2Hasher(time_cost, memory_cost, parallelism), samples)
+        if abs(elapsed - target) < abs(best_time - target):
+            best_time_cost, best_time = time_cost, elapsed
+        if elapsed >= target:
+            break
+    return best_time_cost, best_time
+
+
+password_hashers = build_password_hashers(settings.passwords)
+
+
+def generate_password_hash(plain_password: str) -> str:
+    """Генерация хеша пароля настроенным алгоритмом."""
+    return password_hashers.hash(plain_password)
+
+
+def check_password(plain_password: str, password_hash: str) -> bool:
+    """Проверка пароля через сравнение хеша."""
+    return password_hashers.verify(plain_password, password_hash)
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """Проверяет отличаются ли параметры хеша от настроенных."""
+    return password_hashers.needs_rehash(password_hash)
+
+
+class PasswordHasherPool:
+    """Ограниченный пул потоков для хеширования и проверки паролей.
+
+    bcrypt и argon2 отпускают GIL, поэтому вычисления в потоках не блокируют цикл событий.
+    Если в очереди больше max_queue задач, новые запросы отклоняются с кодом 503.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        """Инициализирует пул, потоки создаются при первом обращении."""
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Пул потоков."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        """Количество задач ожидающих свободный поток."""
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Выполняет функцию в пуле с контролем длины очереди."""
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервис перегружен, повторите попытку позже",
+                headers={"Retry-After": "1"},
+            )
+
+        def timed_call() -> tuple[float, float, T]:
+            started = time.perf_counter()
+            result = func(*args)
+            return started, time.perf_counter(), result
+
+        self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            started, finished, result = await asyncio.get_running_loop().run_in_executor(self.executor, timed_call)
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        self.total_wait_time += started - submitted
+        self.total_run_time += finished - started
+        return result
+
+    async def hash(self, plain_password: str) -> str:
+        """Хеширует пароль в пуле."""
+        return await self.run(generate_password_hash, plain_password)
+
+    async def verify(self, plain_password: str, password_hash: str) -> bool:
+        """Проверяет пароль в пуле."""
+        return await self.run(check_password, plain_password, password_hash)
+
+    def shutdown(self) -> None:
+        """Останавливает пул потоков."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher_pool = PasswordHasherPool(
+    max_workers=settings.passwords.workers,
+    max_queue=settings.passwords.max_queue,
+)
@@ -0,0 +1,109 @@
+"""Сравнение стоимости сериализации страницы списка задач.
+
+fastapi - модель ответа собирается в обработчике, затем FastAPI валидирует ее по response_model,
+    сериализует в словари и кодирует стандартным json.
+fast_json - ORM объекты один раз проходят через заранее собранную схему и сразу сериализуются в байты.
+orjson - то же, но в байты кодирует orjson, если он установлен.
+
+Запуск из каталога backend: python -m benchmarks.json_responses [количество задач на странице] [количество итераций]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.v1.classifiers.registry import classifier_registry
+from app.api.v1.classifiers.schemas import ReadTaskStatus
+from app.api.v1.tasks.schemas import PaginatedTaskList, paginated_task_list_adapter
+from app.db.models import Task
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def make_tasks(count: int) -> list[Task]:
+    """Задачи, как если бы они были загружены из базы."""
+    now = datetime.now(timezone.utc)
+    return [
+        Task(
+            id=uuid4(),
+            title=f"Задача номер {number}",
+            description="Описание задачи " * 20,
+            task_status_id=1 + number % 2,
+            user_id=uuid4(),
+            created_at=now - timedelta(days=number),
+            updated_at=now if number % 3 else None,
+            complete_before=now + timedelta(days=number) if number % 4 else None,
+            completed_at=now if number % 2 else None,
+        )
+        for number in range(count)
+    ]
+
+
+async def fastapi_path(field, tasks: list[Task]) -> bytes:
+    """Путь ответа FastAPI по умолчанию."""
+    content = PaginatedTaskList(count=len(tasks), results=tasks, next_cursor=None)
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+def fast_json_path(tasks: list[Task]) -> bytes:
+    """Путь ответа в режиме fast_json."""
+    content = {"count": len(tasks), "results": tasks, "next_cursor": None}
+    return paginated_task_list_adapter.dump_json(
+        paginated_task_list_adapter.validate_python(content, from_attributes=True)
+    )
+
+
+def orjson_path(tasks: list[Task]) -> bytes:
+    """Путь ответа с кодированием в байты через orjson."""
+    content = {"count": len(tasks), "results": tasks, "next_cursor": None}
+    model = paginated_task_list_adapter.validate_python(content, from_attributes=True)
+    return orjson.dumps(paginated_task_list_adapter.dump_python(model, mode="json"))
+
+
+async def bench(page_size: int, iterations: int) -> dict[str, float]:
+    """Возвращает время сериализации одной задачи в микросекундах для каждого пути."""
+    tasks = make_tasks(page_size)
+    field = create_model_field(name="Response", type_=PaginatedTaskList, mode="serialization")
+    results = {}
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await fastapi_path(field, tasks)
+    results["fastapi"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fast_json_path(tasks)
+    results["fast_json"] = time.perf_counter() - started
+
+    if orjson is not None:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            orjson_path(tasks)
+        results["orjson"] = time.perf_counter() - started
+
+    return {name: elapsed / iterations / page_size * 1_000_000 for name, elapsed in results.items()}
+
+
+def main() -> None:
+    """Выводит таблицу с результатами."""
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    classifier_registry.replace([ReadTaskStatus(id=1, name="Не выполнено"), ReadTaskStatus(id=2, name="Выполнено")])
+    results = asyncio.run(bench(page_size, iterations))
+    print(f"{'способ':<12}{'мкс/задачу':>14}")
+    for name, per_item in results.items():
+        print(f"{name:<12}{per_item:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
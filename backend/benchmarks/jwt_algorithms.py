@@ -0,0 +1,51 @@
+"""Сравнение скорости подписи и проверки токенов для разных алгоритмов.
+
+Запуск из каталога backend: python -m benchmarks.jwt_algorithms [количество итераций]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import jwt
+
+from app.api.v1.auth.keys import generate_private_key
+
+ALGORITHMS = ["RS256", "ES256", "EdDSA"]
+
+
+def bench(algorithm: str, iterations: int) -> tuple[float, float]:
+    """Возвращает количество подписей и проверок в секунду."""
+    private_key = generate_private_key(algorithm)
+    public_key = private_key.public_key()
+    payload = {
+        "sub": str(uuid4()),
+        "token_type": "access",
+        "iat": datetime.now(timezone.utc),
+        "exp": datetime.now(timezone.utc) + timedelta(days=1),
+    }
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        token = jwt.encode(payload, private_key, algorithm=algorithm, headers={"kid": "bench"})
+    sign_rate = iterations / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        jwt.decode(token, public_key, algorithms=[algorithm])
+    verify_rate = iterations / (time.perf_counter() - started)
+    return sign_rate, verify_rate
+
+
+def main() -> None:
+    """Выводит таблицу с результатами."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'алгоритм':<10}{'подпись/с':>14}{'проверка/с':>14}")
+    for algorithm in ALGORITHMS:
+        sign_rate, verify_rate = bench(algorithm, iterations)
+        print(f"{algorithm:<10}{sign_rate:>14.0f}{verify_rate:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Сравнение создания задач по одной и пакетом.
+
+loop - задачи создаются в цикле через create_task_repo, на каждую задачу свой запрос и своя транзакция.
+batch - задачи создаются через create_tasks_repo многострочным INSERT ... RETURNING в одной транзакции.
+
+Бенчмарк создает временного пользователя в базе из настроек приложения и удаляет его вместе с задачами.
+Без учета аутентификации и HTTP, которые при создании задач по одной тоже оплачиваются на каждую задачу.
+
+Запуск из каталога backend: python -m benchmarks.task_batch [количество задач] [количество итераций]
+"""
+
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+from app.api.v1.tasks import crud
+from app.api.v1.tasks.schemas import CreateTask
+from app.constants import NOT_COMPLETED_TASK_STATUS_ID
+from app.db import db_helper
+from app.db.models import User
+
+
+def make_tasks(count: int) -> list[CreateTask]:
+    """Новые задачи."""
+    return [
+        CreateTask(
+            title=f"Задача номер {number}",
+            description="Описание задачи " * 20,
+            task_status_id=NOT_COMPLETED_TASK_STATUS_ID,
+        )
+        for number in range(count)
+    ]
+
+
+async def bench(count: int, iterations: int) -> dict[str, float]:
+    """Возвращает количество созданных задач в секунду для каждого способа."""
+    new_tasks = make_tasks(count)
+    rates = {}
+    async with db_helper.session_factory() as session:
+        user = User(email=f"{uuid4().hex}@example.com", username=uuid4().hex)
+        user.password = uuid4().hex
+        session.add(user)
+        await session.commit()
+        try:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                for new_task in new_tasks:
+                    await crud.create_task_repo(session, new_task, user.id)
+            rates["loop"] = count * iterations / (time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await crud.create_tasks_repo(session, new_tasks, user.id)
+            rates["batch"] = count * iterations / (time.perf_counter() - started)
+        finally:
+            await session.delete(user)
+            await session.commit()
+    await db_helper.dispose()
+    return rates
+
+
+def main() -> None:
+    """Выводит таблицу с результатами."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    rates = asyncio.run(bench(count, iterations))
+    print(f"{'способ':<10}{'задач/с':>14}")
+    for name, rate in rates.items():
+        print(f"{name:<10}{rate:>14.0f}")
+    print(f"ускорение: {rates['batch'] / rates['loop']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Сравнение UUIDv4 и UUIDv7 в качестве первичного ключа.
+
+Для каждого генератора создается временная таблица с UUID первичным ключом, в которую пачками вставляются строки.
+Выводится скорость вставки и размер индекса первичного ключа. Случайные UUIDv4 вставляются в произвольные
+страницы индекса, что приводит к их разделению и росту индекса, UUIDv7 дописываются в конец индекса.
+Также сравнивается скорость генерации ключей в приложении.
+
+Бенчмарку нужна база из настроек приложения с примененными миграциями.
+Запуск из каталога backend: python -m benchmarks.uuid_keys [количество строк] [размер пачки]
+"""
+
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.db import db_helper
+from app.db.ids import UUID7_SQL_FUNCTION, uuid7
+
+GENERATORS = {"uuid4": "gen_random_uuid()", "uuid7": f"{UUID7_SQL_FUNCTION}()"}
+
+
+async def bench_inserts(name: str, generator: str, rows: int, batch_size: int) -> tuple[float, int]:
+    """Возвращает количество вставленных строк в секунду и размер индекса первичного ключа в байтах."""
+    table = f"bench_{name}_keys"
+    async with db_helper.engine.connect() as connection:
+        await connection.execute(
+            text(f"CREATE TEMPORARY TABLE {table} (id uuid PRIMARY KEY DEFAULT {generator}, payload integer)")
+        )
+        await connection.commit()
+        started = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            count = min(batch_size, rows - offset)
+            await connection.execute(
+                text(f"INSERT INTO {table} (payload) SELECT generate_series(1, :count)"), {"count": count}
+            )
+            await connection.commit()
+        rate = rows / (time.perf_counter() - started)
+        index_size = (await connection.execute(text(f"SELECT pg_relation_size('{table}_pkey')"))).scalar()
+        await connection.execute(text(f"DROP TABLE {table}"))
+        await connection.commit()
+    return rate, index_size
+
+
+def bench_generation(iterations: int = 100_000) -> dict[str, float]:
+    """Количество ключей в секунду, генерируемых в приложении."""
+    rates = {}
+    for name, generate in (("uuid4", uuid4), ("uuid7", uuid7)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            generate()
+        rates[name] = iterations / (time.perf_counter() - started)
+    return rates
+
+
+async def main() -> None:
+    """Выводит таблицу с результатами."""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    generation_rates = bench_generation()
+    print(f"{'ключ':<8}{'вставка строк/с':>18}{'индекс, МБ':>14}{'генерация/с':>16}")
+    try:
+        for name, generator in GENERATORS.items():
+            rate, index_size = await bench_inserts(name, generator, rows, batch_size)
+            print(f"{name:<8}{rate:>18.0f}{index_size / 1024 / 1024:>14.1f}{generation_rates[name]:>16.0f}")
+    finally:
+        await db_helper.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
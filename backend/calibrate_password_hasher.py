@@ -0,0 +1,28 @@
+import sys
+
+from app.config import settings
+from app.security.passwords import calibrate_argon2, calibrate_bcrypt
+
+if len(sys.argv) not in (2, 3) or sys.argv[2:] not in ([], ["bcrypt"], ["argon2id"]):
+    print("Использование: python calibrate_password_hasher.py <целевое время в мс> [bcrypt|argon2id]")
+    sys.exit(1)
+
+target = float(sys.argv[1]) / 1000
+algorithm = sys.argv[2] if len(sys.argv) == 3 else settings.passwords.algorithm
+
+if algorithm == "bcrypt":
+    rounds, elapsed = calibrate_bcrypt(target)
+    print(f"bcrypt: {elapsed * 1000:.0f} мс на хеш")
+    print("API_PASSWORDS__ALGORITHM=bcrypt")
+    print(f"API_PASSWORDS__BCRYPT_ROUNDS={rounds}")
+else:
+    time_cost, elapsed = calibrate_argon2(
+        target,
+        memory_cost=settings.passwords.argon2_memory_cost,
+        parallelism=settings.passwords.argon2_parallelism,
+    )
+    print(f"argon2id: {elapsed * 1000:.0f} мс на хеш")
+    print("API_PASSWORDS__ALGORITHM=argon2id")
+    print(f"API_PASSWORDS__ARGON2_TIME_COST={time_cost}")
+    print(f"API_PASSWORDS__ARGON2_MEMORY_COST={settings.passwords.argon2_memory_cost}")
+    print(f"API_PASSWORDS__ARGON2_PARALLELISM={settings.passwords.argon2_parallelism}")
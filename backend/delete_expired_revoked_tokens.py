@@ -0,0 +1,17 @@
+import asyncio
+
+from app.api.v1.auth.crud import delete_expired_revoked_tokens_repo
+from app.db import db_helper
+
+
+async def main() -> None:
+    """Удаляет истекшие отозванные токены и закрывает соединения с базой."""
+    try:
+        async with db_helper.session_factory() as session:
+            deleted = await delete_expired_revoked_tokens_repo(session)
+    finally:
+        await db_helper.dispose()
+    print(f"Удалено истекших отозванных токенов: {deleted}")
+
+
+asyncio.run(main())
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+from app.api.v1.auth.keys import generate_private_key, serialize_key_pair
+from app.constants import BASE_DIR
+
+if len(sys.argv) not in (2, 3):
+    print("Использование: python generate_jwt_keys.py <RS256|ES256|EdDSA> [каталог]")
+    sys.exit(1)
+
+algorithm = sys.argv[1]
+directory = Path(sys.argv[2]) if len(sys.argv) == 3 else BASE_DIR / "certs"
+private_key_path = directory / "private_key"
+public_key_path = directory / "public_key.pub"
+
+if private_key_path.exists() or public_key_path.exists():
+    print(f"Ключи уже существуют в {directory}, удалите их или укажите другой каталог")
+    sys.exit(1)
+
+try:
+    private_pem, public_pem = serialize_key_pair(generate_private_key(algorithm))
+except ValueError as e:
+    print(e)
+    sys.exit(1)
+
+directory.mkdir(parents=True, exist_ok=True)
+private_key_path.write_bytes(private_pem)
+private_key_path.chmod(0o600)
+public_key_path.write_bytes(public_pem)
+print(f"Ключи {algorithm} сохранены в {directory}")
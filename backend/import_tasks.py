@@ -0,0 +1,79 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from app.api.v1.classifiers.registry import classifier_registry
+from app.api.v1.tasks.importing import import_tasks
+from app.api.v1.tasks.schemas import RejectedTaskRow, TaskImportReport
+from app.api.v1.users.crud import get_user_by_email_repo
+from app.db import db_helper
+
+CHUNK_SIZE = 64 * 1024
+
+if len(sys.argv) not in (3, 4):
+    print("Использование: python import_tasks.py <email пользователя> <файл .csv или .ndjson> [файл ошибок]")
+    sys.exit(1)
+
+email = sys.argv[1]
+path = Path(sys.argv[2])
+errors_path = Path(sys.argv[3]) if len(sys.argv) == 4 else path.with_name(f"{path.stem}.errors.ndjson")
+file_format = "csv" if path.suffix.lower() == ".csv" else "ndjson"
+started = time.perf_counter()
+
+
+async def read_chunks():
+    """Читает файл частями, не загружая его в память целиком."""
+    with path.open("rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+def print_progress(report: TaskImportReport) -> None:
+    """Выводит количество обработанных записей."""
+    rate = report.total / max(time.perf_counter() - started, 1e-9)
+    print(
+        f"\rзаписей: {report.total}, отклонено: {report.rejected}, {rate:.0f} записей/с",
+        end="",
+        file=sys.stderr,
+    )
+
+
+async def run_import() -> int:
+    """Импортирует задачи пользователя, отклоненные записи сохраняются в файл ошибок."""
+    async with db_helper.session_factory() as session:
+        user = await get_user_by_email_repo(session, email)
+        if user is None:
+            print(f"Пользователь {email} не найден")
+            return 1
+        await classifier_registry.load(session)
+        with errors_path.open("w", encoding="utf-8") as errors_file:
+
+            def write_error(rejected: RejectedTaskRow) -> None:
+                errors_file.write(json.dumps(rejected.model_dump(), ensure_ascii=False) + "\n")
+
+            try:
+                report = await import_tasks(
+                    session, user.id, read_chunks(), file_format, on_reject=write_error, on_progress=print_progress
+                )
+            except ValueError as error:
+                print(f"\nИмпорт отменен: {error}")
+                return 1
+    print(f"\nСоздано задач: {report.imported}, отклонено записей: {report.rejected}")
+    if report.rejected:
+        print(f"Отклоненные записи сохранены в {errors_path}")
+    else:
+        errors_path.unlink()
+    return 0
+
+
+async def main() -> int:
+    """Запускает импорт и закрывает соединения с базой."""
+    try:
+        return await run_import()
+    finally:
+        await db_helper.dispose()
+
+
+sys.exit(asyncio.run(main()))
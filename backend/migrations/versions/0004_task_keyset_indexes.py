@@ -0,0 +1,44 @@
+"""task_keyset_indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:05:47.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_FIELDS = ('title', 'created_at', 'updated_at', 'complete_before', 'completed_at')
+
+
+def upgrade() -> None:
+    # Индексы строятся без блокировки записи в таблицу задач
+    with op.get_context().autocommit_block():
+        for sort_field in SORT_FIELDS:
+            op.create_index(
+                f'ix_tasks_user_id_{sort_field}_id',
+                'tasks',
+                ['user_id', sort_field, 'id'],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for sort_field in reversed(SORT_FIELDS):
+            op.drop_index(
+                f'ix_tasks_user_id_{sort_field}_id',
+                table_name='tasks',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,90 @@
+"""task_counters
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:21:09.640318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Счетчики обновляются один раз на запрос по таблицам переходов, поэтому массовые вставки
+# и обновления задач не блокируют строку счетчика на каждую задачу.
+UPDATE_TASK_COUNTERS_FUNCTION = """
+CREATE FUNCTION update_task_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO task_counters AS counters (user_id, task_status_id, count)
+        SELECT user_id, task_status_id, count(*) FROM new_tasks
+        GROUP BY user_id, task_status_id
+        ORDER BY user_id, task_status_id
+        ON CONFLICT (user_id, task_status_id) DO UPDATE SET count = counters.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE task_counters AS counters SET count = counters.count - deleted.count
+        FROM (
+            SELECT user_id, task_status_id, count(*) AS count FROM old_tasks GROUP BY user_id, task_status_id
+        ) AS deleted
+        WHERE counters.user_id = deleted.user_id AND counters.task_status_id = deleted.task_status_id;
+    ELSE
+        INSERT INTO task_counters AS counters (user_id, task_status_id, count)
+        SELECT user_id, task_status_id, sum(delta) FROM (
+            SELECT user_id, task_status_id, 1 AS delta FROM new_tasks
+            UNION ALL
+            SELECT user_id, task_status_id, -1 AS delta FROM old_tasks
+        ) AS changes
+        GROUP BY user_id, task_status_id
+        HAVING sum(delta) <> 0
+        ORDER BY user_id, task_status_id
+        ON CONFLICT (user_id, task_status_id) DO UPDATE SET count = counters.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.create_table('task_counters',
+    sa.Column('user_id', sa.Uuid(), nullable=False, comment='Идентификатор пользователя'),
+    sa.Column('task_status_id', sa.Integer(), nullable=False, comment='Идентификатор статуса'),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False, comment='Количество задач'),
+    sa.ForeignKeyConstraint(['task_status_id'], ['cl_task_status.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'task_status_id'),
+    comment='Количество задач пользователя в статусе, поддерживается триггерами таблицы задач.'
+    )
+    op.execute(UPDATE_TASK_COUNTERS_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER tasks_counters_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_tasks "
+        "FOR EACH STATEMENT EXECUTE FUNCTION update_task_counters()"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_counters_update AFTER UPDATE ON tasks "
+        "REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks "
+        "FOR EACH STATEMENT EXECUTE FUNCTION update_task_counters()"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_counters_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_tasks "
+        "FOR EACH STATEMENT EXECUTE FUNCTION update_task_counters()"
+    )
+    op.execute(
+        "INSERT INTO task_counters (user_id, task_status_id, count) "
+        "SELECT user_id, task_status_id, count(*) FROM tasks GROUP BY user_id, task_status_id"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER tasks_counters_delete ON tasks")
+    op.execute("DROP TRIGGER tasks_counters_update ON tasks")
+    op.execute("DROP TRIGGER tasks_counters_insert ON tasks")
+    op.execute("DROP FUNCTION update_task_counters()")
+    op.drop_table('task_counters')
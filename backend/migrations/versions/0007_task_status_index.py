@@ -0,0 +1,39 @@
+"""task_status_index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 17:32:54.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_id_task_status_id',
+            'tasks',
+            ['user_id', 'task_status_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_user_id_task_status_id',
+            table_name='tasks',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
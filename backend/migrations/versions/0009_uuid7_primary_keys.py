@@ -0,0 +1,54 @@
+"""uuid7_primary_keys
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 21:12:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'tasks')
+
+# UUIDv7 по RFC 9562: первые 48 бит случайного UUIDv4 заменяются временем в миллисекундах,
+# биты версии 0100 дополняются до 0111. Внутри одной миллисекунды порядок ключей не гарантируется.
+UUID_GENERATE_V7_FUNCTION = """
+CREATE FUNCTION uuid_generate_v7() RETURNS uuid LANGUAGE sql VOLATILE PARALLEL SAFE AS $$
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    PLACING substring(int8send((extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute(UUID_GENERATE_V7_FUNCTION)
+    # Существующие UUIDv4 не меняются, упорядоченными по времени будут только новые ключи
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('gen_random_uuid()'))
+    op.execute('DROP FUNCTION uuid_generate_v7()')
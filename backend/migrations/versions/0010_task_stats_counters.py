@@ -0,0 +1,128 @@
+"""task_stats_counters
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 22:37:15.904126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Счетчики по дням: таблица, день задачи по UTC и условие, при котором задача учитывается в счетчике.
+# 2 - COMPLETED_TASK_STATUS_ID, миграция фиксирует значение на момент создания и не зависит от кода приложения
+DATE_COUNTERS = (
+    (
+        'task_deadline_counters',
+        "(complete_before AT TIME ZONE 'UTC')::date",
+        'complete_before IS NOT NULL AND task_status_id <> 2',
+    ),
+    (
+        'task_completion_counters',
+        "(completed_at AT TIME ZONE 'UTC')::date",
+        'completed_at IS NOT NULL',
+    ),
+)
+
+
+def upsert_counters(table: str, day: str, condition: str, sources: Sequence[tuple[str, int]]) -> str:
+    """Добавляет к счетчикам изменения из таблиц переходов."""
+    changes = ' UNION ALL '.join(
+        f'SELECT user_id, {day} AS day, {delta} AS delta FROM {source} WHERE {condition}' for source, delta in sources
+    )
+    return f"""
+        INSERT INTO {table} AS counters (user_id, day, count)
+        SELECT user_id, day, sum(delta) FROM ({changes}) AS changes
+        GROUP BY user_id, day
+        HAVING sum(delta) <> 0
+        ORDER BY user_id, day
+        ON CONFLICT (user_id, day) DO UPDATE SET count = counters.count + EXCLUDED.count;"""
+
+
+def subtract_counters(table: str, day: str, condition: str) -> str:
+    """Вычитает удаленные задачи из счетчиков.
+
+    Обновляются только существующие строки, так как при удалении пользователя его счетчики уже удалены каскадом.
+    """
+    return f"""
+        UPDATE {table} AS counters SET count = counters.count - deleted.count
+        FROM (
+            SELECT user_id, {day} AS day, count(*) AS count FROM old_tasks WHERE {condition} GROUP BY user_id, day
+        ) AS deleted
+        WHERE counters.user_id = deleted.user_id AND counters.day = deleted.day;"""
+
+
+UPDATE_TASK_DATE_COUNTERS_FUNCTION = f"""
+CREATE FUNCTION update_task_date_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {''.join(upsert_counters(*counter, [('new_tasks', 1)]) for counter in DATE_COUNTERS)}
+    ELSIF TG_OP = 'DELETE' THEN
+        {''.join(subtract_counters(*counter) for counter in DATE_COUNTERS)}
+    ELSE
+        {''.join(upsert_counters(*counter, [('new_tasks', 1), ('old_tasks', -1)]) for counter in DATE_COUNTERS)}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def create_counters_table(table: str, day_comment: str, comment: str) -> None:
+    op.create_table(table,
+    sa.Column('user_id', sa.Uuid(), nullable=False, comment='Идентификатор пользователя'),
+    sa.Column('day', sa.Date(), nullable=False, comment=day_comment),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False, comment='Количество задач'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day'),
+    comment=comment
+    )
+
+
+def upgrade() -> None:
+    create_counters_table(
+        'task_deadline_counters',
+        'День срока выполнения по UTC',
+        'Количество невыполненных задач пользователя со сроком выполнения в день по UTC, поддерживается триггерами.',
+    )
+    create_counters_table(
+        'task_completion_counters',
+        'День выполнения по UTC',
+        'Количество задач пользователя, выполненных в день по UTC, поддерживается триггерами таблицы задач.',
+    )
+    op.execute(UPDATE_TASK_DATE_COUNTERS_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER tasks_date_counters_insert AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_tasks "
+        "FOR EACH STATEMENT EXECUTE FUNCTION update_task_date_counters()"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_date_counters_update AFTER UPDATE ON tasks "
+        "REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks "
+        "FOR EACH STATEMENT EXECUTE FUNCTION update_task_date_counters()"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_date_counters_delete AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_tasks "
+        "FOR EACH STATEMENT EXECUTE FUNCTION update_task_date_counters()"
+    )
+    for table, day, condition in DATE_COUNTERS:
+        op.execute(
+            f"INSERT INTO {table} (user_id, day, count) "
+            f"SELECT user_id, {day} AS day, count(*) FROM tasks WHERE {condition} GROUP BY user_id, day"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER tasks_date_counters_delete ON tasks")
+    op.execute("DROP TRIGGER tasks_date_counters_update ON tasks")
+    op.execute("DROP TRIGGER tasks_date_counters_insert ON tasks")
+    op.execute("DROP FUNCTION update_task_date_counters()")
+    op.drop_table('task_completion_counters')
+    op.drop_table('task_deadline_counters')
@@ -0,0 +1,40 @@
+"""drop_tasks_user_id_index
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 10:12:41.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # user_id - префикс всех составных индексов (user_id, ..., id), отдельный индекс только замедляет запись
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tasks_user_id',
+            table_name='tasks',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_id',
+            'tasks',
+            ['user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
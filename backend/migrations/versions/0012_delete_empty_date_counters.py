@@ -0,0 +1,103 @@
+"""delete_empty_date_counters
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 14:05:27.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Счетчики по дням из 0010: таблица, день задачи по UTC и условие, при котором задача учитывается в счетчике.
+# 2 - COMPLETED_TASK_STATUS_ID, миграция фиксирует значение на момент создания и не зависит от кода приложения
+DATE_COUNTERS = (
+    (
+        'task_deadline_counters',
+        "(complete_before AT TIME ZONE 'UTC')::date",
+        'complete_before IS NOT NULL AND task_status_id <> 2',
+    ),
+    (
+        'task_completion_counters',
+        "(completed_at AT TIME ZONE 'UTC')::date",
+        'completed_at IS NOT NULL',
+    ),
+)
+
+
+def upsert_counters(table: str, day: str, condition: str, sources: Sequence[tuple[str, int]]) -> str:
+    """Добавляет к счетчикам изменения из таблиц переходов."""
+    changes = ' UNION ALL '.join(
+        f'SELECT user_id, {day} AS day, {delta} AS delta FROM {source} WHERE {condition}' for source, delta in sources
+    )
+    return f"""
+        INSERT INTO {table} AS counters (user_id, day, count)
+        SELECT user_id, day, sum(delta) FROM ({changes}) AS changes
+        GROUP BY user_id, day
+        HAVING sum(delta) <> 0
+        ORDER BY user_id, day
+        ON CONFLICT (user_id, day) DO UPDATE SET count = counters.count + EXCLUDED.count;"""
+
+
+def subtract_counters(table: str, day: str, condition: str) -> str:
+    """Вычитает удаленные задачи из счетчиков.
+
+    Обновляются только существующие строки, так как при удалении пользователя его счетчики уже удалены каскадом.
+    """
+    return f"""
+        UPDATE {table} AS counters SET count = counters.count - deleted.count
+        FROM (
+            SELECT user_id, {day} AS day, count(*) AS count FROM old_tasks WHERE {condition} GROUP BY user_id, day
+        ) AS deleted
+        WHERE counters.user_id = deleted.user_id AND counters.day = deleted.day;"""
+
+
+def delete_empty_counters(table: str, day: str, condition: str) -> str:
+    """Удаляет обнулившиеся счетчики.
+
+    Счетчик уменьшается только за счет задач из old_tasks, поэтому проверяются только их дни.
+    """
+    return f"""
+        DELETE FROM {table} AS counters
+        USING (SELECT DISTINCT user_id, {day} AS day FROM old_tasks WHERE {condition}) AS changed
+        WHERE counters.user_id = changed.user_id AND counters.day = changed.day AND counters.count = 0;"""
+
+
+def update_task_date_counters_function(delete_empty: bool) -> str:
+    """Функция триггеров счетчиков по дням, с удалением обнулившихся счетчиков или без него, как в 0010."""
+    cleanup = ''.join(delete_empty_counters(*counter) for counter in DATE_COUNTERS) if delete_empty else ''
+    return f"""
+CREATE OR REPLACE FUNCTION update_task_date_counters() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {''.join(upsert_counters(*counter, [('new_tasks', 1)]) for counter in DATE_COUNTERS)}
+    ELSIF TG_OP = 'DELETE' THEN
+        {''.join(subtract_counters(*counter) for counter in DATE_COUNTERS)}
+        {cleanup}
+    ELSE
+        {''.join(upsert_counters(*counter, [('new_tasks', 1), ('old_tasks', -1)]) for counter in DATE_COUNTERS)}
+        {cleanup}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    # Без удаления нулевых счетчиков таблица просроченных задач растет на строку за каждый день срока,
+    # даже когда все задачи этого дня уже выполнены или удалены
+    op.execute(update_task_date_counters_function(delete_empty=True))
+    for table, _, _ in DATE_COUNTERS:
+        op.execute(f"DELETE FROM {table} WHERE count = 0")
+
+
+def downgrade() -> None:
+    op.execute(update_task_date_counters_function(delete_empty=False))
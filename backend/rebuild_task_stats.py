@@ -0,0 +1,40 @@
+import asyncio
+import sys
+import time
+
+from app.api.v1.tasks.crud import rebuild_task_stats_repo
+from app.api.v1.users.crud import get_user_by_email_repo
+from app.db import db_helper
+
+if len(sys.argv) not in (1, 2):
+    print("Использование: python rebuild_task_stats.py [email пользователя]")
+    sys.exit(1)
+
+email = sys.argv[1] if len(sys.argv) == 2 else None
+
+
+async def rebuild() -> int:
+    """Пересчитывает счетчики задач всех пользователей или одного пользователя."""
+    async with db_helper.session_factory() as session:
+        user_id = None
+        if email is not None:
+            user = await get_user_by_email_repo(session, email)
+            if user is None:
+                print(f"Пользователь {email} не найден")
+                return 1
+            user_id = user.id
+        started = time.perf_counter()
+        await rebuild_task_stats_repo(session, user_id)
+    print(f"Счетчики задач пересчитаны за {time.perf_counter() - started:.1f} с")
+    return 0
+
+
+async def main() -> int:
+    """Запускает пересчет и закрывает соединения с базой."""
+    try:
+        return await rebuild()
+    finally:
+        await db_helper.dispose()
+
+
+sys.exit(asyncio.run(main()))
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import nullcontext
 from typing import Generator, AsyncGenerator
 
 import alembic
@@ -11,6 +12,7 @@ from httpx import AsyncClient, ASGITransport
 
 from app import main_app
 from app.api.v1.auth.jwt import create_refresh_token, create_access_token
+from app.api.v1.classifiers.registry import classifier_registry
 from app.db.models import User
 from tests.constants import TEST_MIGRATIONS_HOST, TEST_APP_HOST
 from tests.functions import wait_for_port
@@ -20,8 +22,9 @@ from app.config import settings
 
 
 @pytest_asyncio.fixture
-async def client(session_override) -> AsyncGenerator[AsyncClient, None]:
+async def client(session_override, db_session) -> AsyncGenerator[AsyncClient, None]:
     """Фикстура клиента для тестов АПИ."""
+    await classifier_registry.load(db_session)
     async with AsyncClient(app=main_app, base_url="http://localhost:8000") as ac:
         yield ac
 
@@ -138,6 +141,8 @@ def session_override(db_session):
 
     # monkeypatch.setattr("app.api.v1.users.views.db_helper.get_session", get_session_override)
     main_app.dependency_overrides[db_helper.get_session] = get_session_override
+    main_app.dependency_overrides[db_helper.get_read_session] = get_session_override
+    main_app.dependency_overrides[db_helper.get_read_session_factory] = lambda: lambda: nullcontext(db_session)
 
 
 @pytest.fixture
@@ -0,0 +1,20 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_get_task_status_list_etag(client: AsyncClient):
+    """Проверяет получение классификатора статусов задач и ответ 304 по ETag."""
+    response = await client.get("/api/v1/classifiers/task_status/")
+
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert {task_status["id"] for task_status in response.json()} == {1, 2}, "Статусы задач не совпадают"
+    etag = response.headers["ETag"]
+
+    response = await client.get("/api/v1/classifiers/task_status/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED, "Не изменившийся классификатор отдан повторно"
+
+    for if_none_match in (f"W/{etag}", f'"other", {etag}', "*"):
+        response = await client.get("/api/v1/classifiers/task_status/", headers={"If-None-Match": if_none_match})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, f"Не учтен If-None-Match: {if_none_match}"
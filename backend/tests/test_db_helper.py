@@ -0,0 +1,43 @@
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.db_helper import EagerReleaseSession
+from app.db.ids import UUID7_SQL_FUNCTION, uuid7, uuid7_timestamp
+from app.db.models import User
+
+
+@pytest.mark.asyncio
+async def test_eager_release_session(engine: AsyncEngine):
+    """Проверяет что сессия возвращает соединение в пул после чтения и держит его при наличии изменений."""
+    async with EagerReleaseSession(bind=engine, expire_on_commit=False) as session:
+        await session.execute(text("SELECT 1"))
+        assert not session.in_transaction(), "Соединение не возвращено после запроса на чтение"
+        assert engine.pool.checkedout() == 0, "Соединение не возвращено в пул"
+
+        session.add(User(email="eager@example.com", first_name="Имя", second_name="Фамилия", username="eager"))
+        await session.execute(text("SELECT 1"))
+        assert session.in_transaction(), "Транзакция с изменениями завершена до commit"
+        await session.rollback()
+        assert engine.pool.checkedout() == 0, "Соединение не возвращено в пул после rollback"
+
+
+def test_uuid7():
+    """Проверяет версию, время и возрастание ключей UUIDv7."""
+    started = time.time()
+    keys = [uuid7() for _ in range(10000)]
+    assert all(key.version == 7 for key in keys), "Версия ключа не 7"
+    assert keys == sorted(keys), "Ключи не возрастают"
+    assert len(set(keys)) == len(keys), "Ключи повторяются"
+    assert abs(uuid7_timestamp(keys[0]) - started) < 1, "Время ключа не совпадает с текущим"
+
+
+@pytest.mark.asyncio
+async def test_uuid7_sql_function(engine: AsyncEngine):
+    """Проверяет SQL функцию генерации UUIDv7."""
+    async with engine.connect() as connection:
+        key = (await connection.execute(text(f"SELECT {UUID7_SQL_FUNCTION}()"))).scalar()
+    assert key.version == 7, "Версия ключа не 7"
+    assert abs(uuid7_timestamp(key) - time.time()) < 60, "Время ключа не совпадает с текущим"
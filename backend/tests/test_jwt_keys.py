@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import jwt
+import pytest
+
+from app.api.v1.auth.keys import KeyManager, generate_private_key, serialize_key_pair
+
+
+def write_key_pair(directory: Path, algorithm: str) -> tuple[Path, Path]:
+    """Генерирует пару ключей для алгоритма и сохраняет ее в PEM файлы."""
+    private_pem, public_pem = serialize_key_pair(generate_private_key(algorithm))
+    private_key_path = directory / f"{algorithm}_private_key"
+    public_key_path = directory / f"{algorithm}_public_key.pub"
+    private_key_path.write_bytes(private_pem)
+    public_key_path.write_bytes(public_pem)
+    return private_key_path, public_key_path
+
+
+def sign(key_manager: KeyManager, payload: dict) -> str:
+    """Подписывает токен текущим ключом менеджера."""
+    signing_key = key_manager.signing_key
+    return jwt.encode(
+        payload, signing_key.private_key, algorithm=signing_key.algorithm, headers={"kid": signing_key.kid}
+    )
+
+
+def verify(key_manager: KeyManager, token: str) -> dict:
+    """Проверяет токен ключом менеджера по kid из заголовка."""
+    verification_key = key_manager.get_verification_key(jwt.get_unverified_header(token)["kid"])
+    return jwt.decode(token, verification_key.public_key, algorithms=[verification_key.algorithm])
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "PS256", "ES256", "ES384", "ES512", "EdDSA"])
+def test_key_pair_round_trip(tmp_path: Path, algorithm: str):
+    """Проверяет определение алгоритма по ключу и подпись и проверку токена для каждого алгоритма."""
+    private_key_path, public_key_path = write_key_pair(tmp_path, algorithm)
+    key_manager = KeyManager("main", private_key_path, public_key_path, rsa_algorithm=algorithm)
+    key_manager.load()
+
+    assert key_manager.signing_key.algorithm == algorithm, "Алгоритм ключа определен неверно"
+    assert verify(key_manager, sign(key_manager, {"sub": "user"})) == {"sub": "user"}, "Токен не прошел проверку"
+
+
+def test_key_pair_mismatch(tmp_path: Path):
+    """Проверяет отказ загрузки приватного и публичного ключей из разных пар."""
+    private_key_path, _ = write_key_pair(tmp_path, "ES256")
+    _, public_key_path = write_key_pair(tmp_path, "EdDSA")
+
+    with pytest.raises(ValueError):
+        KeyManager("main", private_key_path, public_key_path).load()
+
+
+def test_verification_key_of_other_algorithm(tmp_path: Path):
+    """Проверяет прием токенов, подписанных ключом предыдущего поколения другого алгоритма."""
+    old_private_key_path, old_public_key_path = write_key_pair(tmp_path, "RS256")
+    old_key_manager = KeyManager("old", old_private_key_path, old_public_key_path)
+    token = sign(old_key_manager, {"sub": "user"})
+
+    private_key_path, public_key_path = write_key_pair(tmp_path, "EdDSA")
+    key_manager = KeyManager("new", private_key_path, public_key_path, verification_keys={"old": old_public_key_path})
+
+    assert verify(key_manager, token) == {"sub": "user"}, "Токен ключа предыдущего поколения не прошел проверку"
+    assert key_manager.get_verification_key("old").algorithm == "RS256", "Алгоритм старого ключа определен неверно"
@@ -0,0 +1,19 @@
+from app.security.passwords import BcryptHasher, PasswordHashers, calibrate_bcrypt
+
+
+def test_password_hashers_rehash():
+    """Проверяет проверку хешей с устаревшими параметрами и необходимость их пересчета."""
+    legacy_hash = BcryptHasher(rounds=4).hash("password")
+    hashers = PasswordHashers(BcryptHasher(rounds=5))
+
+    assert hashers.verify("password", legacy_hash), "Хеш с устаревшими параметрами не прошел проверку"
+    assert not hashers.verify("wrong-password", legacy_hash), "Неверный пароль прошел проверку"
+    assert hashers.needs_rehash(legacy_hash), "Хеш с устаревшими параметрами не требует пересчета"
+    assert not hashers.needs_rehash(hashers.hash("password")), "Хеш с текущими параметрами требует пересчета"
+
+
+def test_calibrate_bcrypt():
+    """Проверяет подбор стоимости bcrypt под целевое время."""
+    rounds, elapsed = calibrate_bcrypt(target=0, samples=1)
+    assert rounds == 4, "Для нулевого времени выбрана не минимальная стоимость"
+    assert elapsed > 0, "Время хеширования не измерено"
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+from typing import get_args
+
+import pytest
+from faker import Faker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.tasks.crud import tasks_for_user_query
+from app.api.v1.tasks.filters import TASK_FILTERS, TASK_SORTS, TaskFilter, TaskListParams, TaskSortField
+from app.api.v1.tasks.pagination import Cursor, keyset_conditions
+from app.constants import NOT_COMPLETED_TASK_STATUS_ID
+from app.db.models import Task, User
+from app.db.queries import explain
+from tests.functions import create_test_task
+
+# Значения для проверки каждого фильтра
+FILTER_VALUES = {
+    "title": "задача",
+    "task_status_id": NOT_COMPLETED_TASK_STATUS_ID,
+    "created_from": datetime(2020, 1, 1, tzinfo=timezone.utc),
+    "created_to": datetime(2030, 1, 1, tzinfo=timezone.utc),
+    "complete_before_from": datetime(2020, 1, 1, tzinfo=timezone.utc),
+    "complete_before_to": datetime(2030, 1, 1, tzinfo=timezone.utc),
+    "completed_from": datetime(2020, 1, 1, tzinfo=timezone.utc),
+    "completed_to": datetime(2030, 1, 1, tzinfo=timezone.utc),
+}
+
+# Курсоры для проверки: по задаче с заполненным полем сортировки и, для полей с NULL, по задаче без значения
+CURSORS = [
+    pytest.param(sort_field, cursor_null, id=f"{sort_field}-{'null' if cursor_null else 'value'}")
+    for sort_field in get_args(TaskSortField)
+    for cursor_null in (False, True)
+    if not cursor_null or Task.__table__.c[sort_field].nullable
+]
+
+
+def index_scans(plan: dict, ancestors: tuple[str, ...] = ()):
+    """Обходит узлы чтения индексов плана запроса вместе с типами узлов над ними."""
+    if plan["Node Type"] in ("Index Scan", "Index Only Scan", "Bitmap Index Scan"):
+        yield plan, ancestors
+    for child in plan.get("Plans", []):
+        yield from index_scans(child, (*ancestors, plan["Node Type"]))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "task_filter", [None, *TASK_FILTERS], ids=lambda task_filter: getattr(task_filter, "param", "")
+)
+@pytest.mark.parametrize("sort_field", get_args(TaskSortField))
+@pytest.mark.parametrize("sort_direction", ["asc", "desc"])
+async def test_task_list_uses_index(
+    db_session: AsyncSession,
+    user_one: User,
+    faker: Faker,
+    task_filter: TaskFilter | None,
+    sort_field: str,
+    sort_direction: str,
+):
+    """Проверяет что каждая комбинация фильтра и сортировки списка задач выполняется по своему индексу.
+
+    Запрос должен читать индекс сортировки или индекс фильтра. Индекс сортировки уже отдает строки в нужном
+    порядке, поэтому над ним не должно быть узла Sort.
+    """
+    db_session.add_all(create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(50))
+    await db_session.commit()
+    # Последовательное чтение выбирается только если индекс не подходит для запроса
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    params = TaskListParams(sort_field=sort_field, sort_direction=sort_direction)
+    expected_indexes = {TASK_SORTS[sort_field]}
+    if task_filter is not None:
+        params = params.model_copy(update={task_filter.param: FILTER_VALUES[task_filter.param]})
+        expected_indexes.add(task_filter.index)
+    plan = await explain(db_session, tasks_for_user_query(user_one.id, params))
+
+    scans = list(index_scans(plan))
+    description = f"Запрос с фильтром {task_filter and task_filter.param} и сортировкой {sort_field} {sort_direction}"
+    assert scans, f"{description} не использует индекс"
+    for scan, ancestors in scans:
+        index_name = scan["Index Name"]
+        assert index_name in expected_indexes, f"{description} использует индекс {index_name}"
+        if index_name == TASK_SORTS[sort_field]:
+            assert "Sort" not in ancestors and "Incremental Sort" not in ancestors, (
+                f"{description} сортирует строки, прочитанные по индексу сортировки"
+            )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_field, cursor_null", CURSORS)
+@pytest.mark.parametrize("sort_direction", ["asc", "desc"])
+async def test_task_list_cursor_uses_index_cond(
+    db_session: AsyncSession,
+    user_one: User,
+    faker: Faker,
+    sort_field: str,
+    cursor_null: bool,
+    sort_direction: str,
+):
+    """Проверяет что условие курсора для каждого сегмента списка задает диапазон индекса сортировки.
+
+    Сравнение строк (поле, id) или проверка поля на NULL должны попасть в Index Cond узла чтения индекса,
+    а не в Filter, иначе постраничный вывод читает все задачи до курсора.
+    """
+    tasks = [create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(50)]
+    if Task.__table__.c[sort_field].nullable:
+        for number, task in enumerate(tasks):
+            value = None if number % 2 else faker.date_time(tzinfo=timezone.utc)
+            setattr(task, sort_field, value)
+    db_session.add_all(tasks)
+    await db_session.commit()
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    task = next(task for task in tasks if (getattr(task, sort_field) is None) == cursor_null)
+    cursor = Cursor(sort_field=sort_field, sort_direction=sort_direction, value=getattr(task, sort_field), id=task.id)
+    params = TaskListParams(sort_field=sort_field, sort_direction=sort_direction)
+    for condition in keyset_conditions(cursor):
+        plan = await explain(db_session, tasks_for_user_query(user_one.id, params, condition))
+
+        description = f"Сегмент {condition} при сортировке {sort_field} {sort_direction}"
+        scans = [scan for scan, _ in index_scans(plan) if scan["Index Name"] == TASK_SORTS[sort_field]]
+        assert scans, f"{description} не читает индекс сортировки"
+        for scan in scans:
+            assert sort_field in scan.get("Index Cond", ""), f"{description} не ограничивает диапазон индекса"
+            assert sort_field not in scan.get("Filter", ""), f"{description} фильтрует строки после чтения индекса"
@@ -0,0 +1,426 @@
+import csv
+import datetime
+import io
+import json
+from pprint import pprint
+
+import pytest
+from faker.proxy import Faker
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.tasks.crud import rebuild_task_stats_repo
+from app.config import settings
+from app.constants import COMPLETED_TASK_STATUS_ID, NOT_COMPLETED_TASK_STATUS_ID
+from app.db.models import Task, TaskDeadlineCounter, User
+from tests.functions import create_test_task
+
+
+@pytest.mark.asyncio
+async def test_get_task_list(
+    client: AsyncClient, user_one: User, access_token_user_one: str, db_session: AsyncSession, faker: Faker
+):
+    """Проверяет получение списка задач пользователя."""
+    tasks = [create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(3)]
+    db_session.add_all(tasks)
+    await db_session.commit()
+
+    response = await client.get("/api/v1/tasks/", headers={"Authorization": f"Bearer {access_token_user_one}"})
+    response_json = response.json()
+    pprint(response_json)
+
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert response_json["count"] == 3, "Количество задач не совпадает"
+    assert {task["id"] for task in response_json["results"]} == {str(task.id) for task in tasks}, "Задачи не совпадают"
+
+
+@pytest.mark.asyncio
+async def test_principal_mode_after_user_delete(
+    client: AsyncClient, user_one: User, access_token_user_one: str, monkeypatch: pytest.MonkeyPatch
+):
+    """Проверяет что в режиме principal удаленный пользователь теряет доступ к задачам."""
+    monkeypatch.setattr(settings.principal, "enabled", True)
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+
+    response = await client.delete("/api/v1/users/me/", headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT, "Пользователь не удален"
+
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND, "Удаленный пользователь получил доступ к задачам"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_field", ["title", "created_at", "updated_at", "complete_before", "completed_at"])
+@pytest.mark.parametrize("sort_direction", ["asc", "desc"])
+async def test_get_task_list_by_cursor(
+    client: AsyncClient,
+    user_one: User,
+    access_token_user_one: str,
+    db_session: AsyncSession,
+    faker: Faker,
+    sort_field: str,
+    sort_direction: str,
+):
+    """Проверяет постраничный обход списка задач по курсору, включая задачи с пустым полем сортировки.
+
+    Для полей, допускающих NULL, задачи с пустым и заполненным полем чередуются, поэтому страницы
+    начинаются и заканчиваются в обоих сегментах списка и переходят из одного в другой.
+    """
+    tasks = [create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(7)]
+    if Task.__table__.c[sort_field].nullable:
+        for number, task in enumerate(tasks):
+            value = faker.date_time(tzinfo=datetime.timezone.utc) if number % 2 else None
+            setattr(task, sort_field, value)
+    db_session.add_all(tasks)
+    await db_session.commit()
+
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+    params = {"sort_field": sort_field, "sort_direction": sort_direction, "limit": 3}
+    response = await client.get("/api/v1/tasks/", headers=headers, params=params)
+    task_ids = []
+    pages = 0
+    while True:
+        assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+        response_json = response.json()
+        task_ids.extend(task["id"] for task in response_json["results"])
+        pages += 1
+        if response_json["next_cursor"] is None:
+            break
+        response = await client.get(
+            "/api/v1/tasks/", headers=headers, params=params | {"cursor": response_json["next_cursor"]}
+        )
+
+    assert pages == 3, "Количество страниц не совпадает"
+    assert len(task_ids) == len(set(task_ids)), "Задачи на страницах повторяются"
+    assert set(task_ids) == {str(task.id) for task in tasks}, "Задачи не совпадают"
+
+
+@pytest.mark.asyncio
+async def test_get_task_list_count_modes(
+    client: AsyncClient, user_one: User, access_token_user_one: str, db_session: AsyncSession, faker: Faker
+):
+    """Проверяет режимы подсчета количества задач и обновление счетчиков при изменении задач."""
+    tasks = [create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(4)]
+    tasks[0].title = "Особая задача"
+    db_session.add_all(tasks)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+
+    response = await client.get("/api/v1/tasks/", headers=headers, params={"count": "none"})
+    assert response.json()["count"] is None, "Количество посчитано без запроса"
+
+    response = await client.get("/api/v1/tasks/", headers=headers, params={"title": "Особая"})
+    assert response.json()["count"] == 1, "Количество задач с фильтром по названию не совпадает"
+
+    response = await client.patch(
+        f"/api/v1/tasks/{tasks[1].id}", headers=headers, json={"id": COMPLETED_TASK_STATUS_ID}
+    )
+    assert response.status_code == status.HTTP_200_OK, "Статус задачи не обновлен"
+    response = await client.delete(f"/api/v1/tasks/{tasks[2].id}", headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT, "Задача не удалена"
+
+    response = await client.get(
+        "/api/v1/tasks/", headers=headers, params={"task_status_id": NOT_COMPLETED_TASK_STATUS_ID}
+    )
+    assert response.json()["count"] == 2, "Счетчик невыполненных задач не совпадает"
+    response = await client.get("/api/v1/tasks/", headers=headers, params={"task_status_id": COMPLETED_TASK_STATUS_ID})
+    assert response.json()["count"] == 1, "Счетчик выполненных задач не совпадает"
+
+
+@pytest.mark.asyncio
+async def test_search_tasks(
+    client: AsyncClient, user_one: User, access_token_user_one: str, db_session: AsyncSession, faker: Faker
+):
+    """Проверяет полнотекстовый поиск задач с ранжированием и подсветкой по экранированному тексту."""
+    tasks = [create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(3)]
+    tasks[0].title = "Купить молоко <script>"
+    tasks[1].title = "Позвонить маме"
+    tasks[1].description = "Спросить, нужно ли купить молоко"
+    db_session.add_all(tasks)
+    await db_session.commit()
+
+    response = await client.get(
+        "/api/v1/tasks/search/",
+        headers={"Authorization": f"Bearer {access_token_user_one}"},
+        params={"q": "молоко"},
+    )
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert [result["task"]["id"] for result in response_json["results"]] == [
+        str(tasks[0].id),
+        str(tasks[1].id),
+    ], "Найденные задачи или их порядок не совпадают"
+    title_highlight = response_json["results"][0]["title_highlight"]
+    assert "<b>молоко</b>" in title_highlight, "Совпадение не подсвечено"
+    assert "<script>" not in title_highlight and "&lt;script&gt;" in title_highlight, "Текст задачи не экранирован"
+
+
+@pytest.mark.asyncio
+async def test_task_conditional_requests(
+    client: AsyncClient, user_one: User, access_token_user_one: str, db_session: AsyncSession, faker: Faker
+):
+    """Проверяет ответ 304 по If-None-Match и отклонение изменения устаревшей версии задачи по If-Match."""
+    task = create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker)
+    db_session.add(task)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+
+    response = await client.get(f"/api/v1/tasks/{task.id}", headers=headers)
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers, "Нет заголовка Last-Modified"
+
+    response = await client.get(f"/api/v1/tasks/{task.id}", headers=headers | {"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED, "Не изменившаяся задача отдана повторно"
+    assert not response.content, "Ответ 304 содержит тело"
+
+    response = await client.patch(
+        f"/api/v1/tasks/{task.id}", headers=headers | {"If-Match": etag}, json={"id": COMPLETED_TASK_STATUS_ID}
+    )
+    assert response.status_code == status.HTTP_200_OK, "Изменение актуальной версии отклонено"
+    assert response.headers["ETag"] != etag, "ETag не изменился после обновления"
+
+    response = await client.patch(
+        f"/api/v1/tasks/{task.id}", headers=headers | {"If-Match": etag}, json={"id": NOT_COMPLETED_TASK_STATUS_ID}
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED, "Изменение устаревшей версии не отклонено"
+
+
+@pytest.mark.asyncio
+async def test_task_sparse_fields(
+    client: AsyncClient, user_one: User, access_token_user_one: str, db_session: AsyncSession, faker: Faker
+):
+    """Проверяет ограничение полей ответа в списке задач и при чтении задачи."""
+    task = create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker)
+    db_session.add(task)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+
+    response = await client.get("/api/v1/tasks/", headers=headers, params={"fields": "id,task_status"})
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert response.json()["results"] == [
+        {"id": str(task.id), "task_status": {"name": "Не выполнено"}}
+    ], "Поля задачи в списке не совпадают"
+
+    response = await client.get(f"/api/v1/tasks/{task.id}", headers=headers, params={"fields": "title,description"})
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert response.json() == {"title": task.title, "description": task.description}, "Поля задачи не совпадают"
+
+    response = await client.get("/api/v1/tasks/", headers=headers, params={"fields": "id,password"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, "Запрошено несуществующее поле"
+
+
+@pytest.mark.asyncio
+async def test_task_writes_scoped_by_owner(
+    client: AsyncClient,
+    user_one: User,
+    user_two: User,
+    access_token_user_one: str,
+    db_session: AsyncSession,
+    faker: Faker,
+):
+    """Проверяет смену статуса, удаление задачи владельцем и отказ для задачи другого пользователя."""
+    task = create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker)
+    other_task = create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_two.id, faker)
+    db_session.add_all([task, other_task])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+
+    response = await client.patch(f"/api/v1/tasks/{task.id}", headers=headers, json={"id": COMPLETED_TASK_STATUS_ID})
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert response.json()["completed_at"] is not None, "Выполненная задача не отмечена временем выполнения"
+
+    response = await client.patch(
+        f"/api/v1/tasks/{task.id}", headers=headers, json={"id": NOT_COMPLETED_TASK_STATUS_ID}
+    )
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert response.json()["completed_at"] is None, "Отметка выполнения не снята"
+
+    response = await client.patch(
+        f"/api/v1/tasks/{other_task.id}", headers=headers, json={"id": COMPLETED_TASK_STATUS_ID}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND, "Изменена задача другого пользователя"
+    response = await client.delete(f"/api/v1/tasks/{other_task.id}", headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND, "Удалена задача другого пользователя"
+
+    response = await client.delete(f"/api/v1/tasks/{task.id}", headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT, "Задача не удалена"
+    response = await client.delete(f"/api/v1/tasks/{task.id}", headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND, "Удаленная задача найдена"
+
+
+@pytest.mark.asyncio
+async def test_task_batch(
+    client: AsyncClient,
+    user_one: User,
+    user_two: User,
+    access_token_user_one: str,
+    db_session: AsyncSession,
+    faker: Faker,
+):
+    """Проверяет пакетное создание, изменение и удаление задач с результатами по каждому элементу.
+
+    Запросы отправляются на /tasks/batch без завершающего слэша и перенаправляются на /tasks/batch/.
+    """
+    other_task = create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_two.id, faker)
+    db_session.add(other_task)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+    new_tasks = [
+        {"title": f"Задача {number}", "description": faker.text(), "task_status_id": NOT_COMPLETED_TASK_STATUS_ID}
+        for number in range(3)
+    ]
+    new_tasks[1]["task_status_id"] = 100
+
+    response = await client.post(
+        "/api/v1/tasks/batch", headers=headers, json={"tasks": new_tasks}, follow_redirects=True
+    )
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [201, 422, 201], "Результаты создания не совпадают"
+    assert [results[0]["task"]["title"], results[2]["task"]["title"]] == ["Задача 0", "Задача 2"], (
+        "Порядок созданных задач не совпадает с порядком в запросе"
+    )
+    task_ids = [results[0]["id"], results[2]["id"]]
+
+    response = await client.patch(
+        "/api/v1/tasks/batch",
+        headers=headers,
+        json={
+            "tasks": [
+                {"id": task_ids[0], "task_status_id": COMPLETED_TASK_STATUS_ID},
+                {"id": task_ids[1], "title": "Новый заголовок"},
+                {"id": str(other_task.id), "title": "Чужая задача"},
+            ]
+        },
+        follow_redirects=True,
+    )
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [200, 200, 404], "Результаты изменения не совпадают"
+    assert results[0]["task"]["completed_at"] is not None, "Выполненная задача не отмечена временем выполнения"
+    assert results[1]["task"]["title"] == "Новый заголовок", "Заголовок задачи не изменен"
+
+    response = await client.request(
+        "DELETE",
+        "/api/v1/tasks/batch",
+        headers=headers,
+        json={"ids": [*task_ids, str(other_task.id)]},
+        follow_redirects=True,
+    )
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    assert [result["status"] for result in response.json()["results"]] == [204, 204, 404], (
+        "Результаты удаления не совпадают"
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_tasks(client: AsyncClient, user_one: User, access_token_user_one: str):
+    """Проверяет импорт задач из CSV с отклонением некорректных записей."""
+    content = (
+        "title,description,task_status_id,complete_before\n"
+        '"Купить, молоко","Две строки\nописания",1,2030-01-01T10:00:00+00:00\n'
+        "Оплатить счета,Описание задачи,2,\n"
+        "abc,Описание задачи,1,\n"
+        "Задача с неизвестным статусом,Описание задачи,100,\n"
+    )
+    headers = {"Authorization": f"Bearer {access_token_user_one}", "Content-Type": "text/csv"}
+
+    response = await client.post("/api/v1/tasks/import/", params={"format": "csv"}, headers=headers, content=content)
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    report = response.json()
+    assert (report["total"], report["imported"], report["rejected"]) == (4, 2, 2), "Отчет импорта не совпадает"
+    assert [error["line"] for error in report["errors"]] == [5, 6], "Номера отклоненных строк не совпадают"
+
+    response = await client.get(
+        "/api/v1/tasks/", headers=headers, params={"sort_field": "title", "sort_direction": "asc"}
+    )
+    titles = [task["title"] for task in response.json()["results"]]
+    assert titles == ["Купить, молоко", "Оплатить счета"], "Импортированные задачи не совпадают"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("file_format", ["ndjson", "csv"])
+async def test_export_tasks(
+    client: AsyncClient,
+    user_one: User,
+    user_two: User,
+    access_token_user_one: str,
+    db_session: AsyncSession,
+    faker: Faker,
+    file_format: str,
+):
+    """Проверяет выгрузку всех задач пользователя потоком по пути /tasks/export без завершающего слэша."""
+    tasks = [create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(5)]
+    db_session.add_all([*tasks, create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_two.id, faker)])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+
+    response = await client.get(
+        "/api/v1/tasks/export", headers=headers, params={"format": file_format}, follow_redirects=True
+    )
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    if file_format == "ndjson":
+        exported = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        exported = list(csv.DictReader(io.StringIO(response.text)))
+    assert {task["id"] for task in exported} == {str(task.id) for task in tasks}, "Выгруженные задачи не совпадают"
+    assert {task["title"] for task in exported} == {task.title for task in tasks}, "Заголовки задач не совпадают"
+
+
+@pytest.mark.asyncio
+async def test_task_stats(
+    client: AsyncClient, user_one: User, access_token_user_one: str, db_session: AsyncSession, faker: Faker
+):
+    """Проверяет статистику задач по счетчикам, удаление обнулившихся счетчиков и пересчет счетчиков с нуля."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    tasks = [create_test_task(NOT_COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(4)]
+    tasks[0].complete_before = now - datetime.timedelta(days=3)
+    tasks[1].complete_before = now - datetime.timedelta(seconds=1)
+    tasks[2].complete_before = now + datetime.timedelta(days=1)
+    tasks[3].complete_before = None
+    completed = [create_test_task(COMPLETED_TASK_STATUS_ID, user_one.id, faker) for _ in range(2)]
+    completed[0].completed_at = now
+    completed[1].completed_at = now - datetime.timedelta(days=10)
+    for task in completed:
+        task.complete_before = None
+    db_session.add_all([*tasks, *completed])
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+
+    response = await client.get("/api/v1/tasks/stats", headers=headers, follow_redirects=True)
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    stats = response.json()
+    pprint(stats)
+    assert stats["total"] == 6, "Количество задач не совпадает"
+    assert {item["task_status"]["id"]: item["count"] for item in stats["by_status"]} == {
+        NOT_COMPLETED_TASK_STATUS_ID: 4,
+        COMPLETED_TASK_STATUS_ID: 2,
+    }, "Количество задач по статусам не совпадает"
+    assert stats["overdue"] == 2, "Количество просроченных задач не совпадает"
+    assert (stats["completed_last_7_days"], stats["completed_last_30_days"]) == (1, 2), (
+        "Выполненные задачи не совпадают"
+    )
+
+    response = await client.patch(
+        f"/api/v1/tasks/{tasks[0].id}", headers=headers, json={"id": COMPLETED_TASK_STATUS_ID}
+    )
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    response = await client.get("/api/v1/tasks/stats/", headers=headers)
+    updated_stats = response.json()
+    assert updated_stats["overdue"] == 1, "Выполненная задача осталась просроченной"
+    assert updated_stats["completed_today"] == stats["completed_today"] + 1, "Выполненная задача не учтена"
+    deadline_days = await db_session.scalars(
+        select(TaskDeadlineCounter.day).where(TaskDeadlineCounter.user_id == user_one.id)
+    )
+    assert (now - datetime.timedelta(days=3)).date() not in deadline_days.all(), "Обнулившийся счетчик не удален"
+
+    await rebuild_task_stats_repo(db_session, user_one.id)
+    response = await client.get("/api/v1/tasks/stats/", headers=headers)
+    assert response.json() == updated_stats, "Статистика после пересчета счетчиков не совпадает"
@@ -6,11 +6,17 @@ from faker.proxy import Faker
 from fastapi import status
 from httpx import AsyncClient
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.api.v1.auth.jwt import decode_token
+from app import main_app
+from app.api.v1.auth.jwt import create_access_token, decode_token
+from app.api.v1.users import crud
+from app.api.v1.users.schemas import PartialUpdateUser
+from app.constants import NOT_COMPLETED_TASK_STATUS_ID
+from app.db.db_helper import Replica, db_helper
 from app.db.models import User
-from tests.conftest import faker
+from app.security.passwords import BcryptHasher
 
 
 @pytest.mark.asyncio
@@ -65,6 +71,37 @@ async def test_refresh_jwt(refresh_token_user_one: str, client: AsyncClient, use
     assert refresh_payload["token_type"] == "refresh", "Тип токена не правильный"
 
 
+@pytest.mark.asyncio
+async def test_refresh_jwt_reuse(refresh_token_user_one: str, client: AsyncClient):
+    """Повторное использование refresh токена отклоняется, так как токен отзывается при ротации."""
+    data = {
+        "refresh_token": refresh_token_user_one,
+    }
+    response = await client.post("/api/v1/users/jwt/refresh/", json=data)
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    new_refresh_token = response.json()["refresh_token"]
+    assert decode_token(new_refresh_token)["jti"] != decode_token(refresh_token_user_one)["jti"], "jti не изменился"
+
+    response = await client.post("/api/v1/users/jwt/refresh/", json=data)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, "Отозванный refresh токен принят"
+
+    response = await client.post("/api/v1/users/jwt/validate/", json={"token": refresh_token_user_one})
+    assert response.json()["validation_result"] is False, "Отозванный refresh токен прошел валидацию"
+
+
+@pytest.mark.asyncio
+async def test_revoke_jwt(refresh_token_user_one: str, client: AsyncClient):
+    """Тест отзыва refresh токена."""
+    data = {
+        "refresh_token": refresh_token_user_one,
+    }
+    response = await client.post("/api/v1/users/jwt/revoke/", json=data)
+    assert response.status_code == status.HTTP_204_NO_CONTENT, "Получен код ответа отличный от ожидаемого"
+
+    response = await client.post("/api/v1/users/jwt/refresh/", json=data)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, "Отозванный refresh токен принят"
+
+
 @pytest.mark.asyncio
 async def test_validate_correct_jwt(access_token_user_one: str, client: AsyncClient):
     """Тест валидации jwt токена."""
@@ -129,3 +166,122 @@ async def test_create_user_with_valid_data(client: AsyncClient, faker: Faker, db
     assert user.first_name == data["first_name"], "Имя не совпадает с переданным"
     assert user.second_name == data["second_name"], "Фамилия не совпадает с переданным"
     assert user.middle_name == data["middle_name"], "Отчество не совпадает с переданным"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_user(
+    client: AsyncClient, faker: Faker, user_one: User, user_two: User, access_token_user_one: str
+):
+    """Проверяет отказ при регистрации и изменении пользователя с занятым email или username."""
+    data = {
+        "email": user_one.email,
+        "username": faker.unique.user_name(),
+        "password": faker.password(),
+    }
+    response = await client.post("/api/v1/users/register/", json=data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, "Зарегистрирован пользователь с занятым email"
+
+    response = await client.patch(
+        "/api/v1/users/me/",
+        json={"username": user_two.username},
+        headers={"Authorization": f"Bearer {access_token_user_one}"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, "Изменен username на занятый"
+
+    response = await client.patch(
+        "/api/v1/users/me/",
+        json={"first_name": "Петр"},
+        headers={"Authorization": f"Bearer {access_token_user_one}"},
+    )
+    assert response.status_code == status.HTTP_200_OK, "Не удалось изменить пользователя после отказа"
+    assert response.json()["first_name"] == "Петр", "Имя пользователя не изменилось"
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_with_lagging_replica(
+    client: AsyncClient, faker: Faker, db_session: AsyncSession, engine: AsyncEngine, monkeypatch
+):
+    """Проверяет работу только что зарегистрированного пользователя при отстающей реплике.
+
+    Реплику заменяет сессия на отдельном соединении: незафиксированные данные теста ей не видны,
+    как реплике, еще не получившей изменения основного сервера.
+    """
+    monkeypatch.setattr(db_helper, "replicas", [Replica(name="lagging", engine=engine)])
+    monkeypatch.setattr(db_helper, "_recent_writes", {})
+
+    async def get_read_session_override():
+        if db_helper.select_read_engine() is db_helper.engine:
+            yield db_session
+        else:
+            async with AsyncSession(bind=engine) as session:
+                yield session
+
+    monkeypatch.setitem(main_app.dependency_overrides, db_helper.get_read_session, get_read_session_override)
+    data = {"email": faker.unique.email(), "username": faker.unique.user_name(), "password": faker.password()}
+    response = await client.post("/api/v1/users/register/", json=data)
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    headers = {"Authorization": f"Bearer {create_access_token(UUID(response.json()['id']))}"}
+
+    db_helper._recent_writes.clear()
+    response = await client.get("/api/v1/users/me/", headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND, "Отстающая реплика знает нового пользователя"
+
+    task = {"title": "Новая задача", "description": "Описание задачи", "task_status_id": NOT_COMPLETED_TASK_STATUS_ID}
+    response = await client.post("/api/v1/tasks/", headers=headers, json=task)
+    assert response.status_code == status.HTTP_200_OK, "Пользователь для изменений проверен на реплике"
+
+    response = await client.post(
+        "/api/v1/users/jwt/create/", json={"email": data["email"], "password": data["password"]}
+    )
+    assert response.status_code == status.HTTP_201_CREATED, "Получен код ответа отличный от ожидаемого"
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await client.get("/api/v1/users/me/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK, "После входа чтение пошло на отстающую реплику"
+
+
+@pytest.mark.asyncio
+async def test_rehash_password_on_login(
+    client: AsyncClient, user_one: User, user_one_password: str, db_session: AsyncSession
+):
+    """Проверяет пересчет хеша пароля с устаревшими параметрами при входе."""
+    user_one._password_hash = BcryptHasher(rounds=4).hash(user_one_password)
+    await db_session.commit()
+    legacy_hash = user_one._password_hash
+
+    response = await client.post(
+        "/api/v1/users/jwt/create/", json={"email": user_one.email, "password": user_one_password}
+    )
+    assert response.status_code == status.HTTP_201_CREATED, "Получен код ответа отличный от ожидаемого"
+    await db_session.refresh(user_one)
+    assert user_one._password_hash != legacy_hash, "Хеш с устаревшими параметрами не пересчитан"
+    assert not user_one.password_needs_rehash(), "Новый хеш создан не с текущими параметрами"
+    assert user_one.verify_password(user_one_password), "Новый хеш не проходит проверку пароля"
+
+
+@pytest.mark.asyncio
+async def test_user_conditional_update(
+    client: AsyncClient, user_one: User, access_token_user_one: str, db_session: AsyncSession
+):
+    """Проверяет изменение пользователя по If-Match и отклонение изменения устаревшей версии."""
+    headers = {"Authorization": f"Bearer {access_token_user_one}"}
+    response = await client.get("/api/v1/users/me/", headers=headers)
+    assert response.status_code == status.HTTP_200_OK, "Получен код ответа отличный от ожидаемого"
+    etag = response.headers["ETag"]
+    version = user_one.updated_at
+
+    response = await client.patch(
+        "/api/v1/users/me/", headers=headers | {"If-Match": etag}, json={"first_name": "Иван"}
+    )
+    assert response.status_code == status.HTTP_200_OK, "Изменение актуальной версии отклонено"
+    assert response.headers["ETag"] != etag, "ETag не изменился после обновления"
+
+    response = await client.patch(
+        "/api/v1/users/me/", headers=headers | {"If-Match": etag}, json={"first_name": "Петр"}
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED, "Изменение устаревшей версии не отклонено"
+
+    # Версия изменилась между проверкой If-Match и запросом изменения
+    with pytest.raises(NoResultFound):
+        await crud.update_user_repo(
+            db_session, PartialUpdateUser(first_name="Петр"), User.id == user_one.id, User.updated_at == version
+        )